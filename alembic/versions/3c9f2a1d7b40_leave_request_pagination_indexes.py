@@ -0,0 +1,36 @@
+"""leave request pagination indexes
+
+Revision ID: 3c9f2a1d7b40
+Revises: 
+Create Date: 2026-10-17 09:12:41.381205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9f2a1d7b40'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_leave_requests_status_applied_at', 'leave_requests',
+        ['status', 'applied_at', 'request_id'], unique=False, if_not_exists=True
+    )
+    op.create_index(
+        'ix_leave_requests_user_id_applied_at', 'leave_requests',
+        ['user_id', 'applied_at', 'request_id'], unique=False, if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_leave_requests_user_id_applied_at', table_name='leave_requests', if_exists=True)
+    op.drop_index('ix_leave_requests_status_applied_at', table_name='leave_requests', if_exists=True)
@@ -0,0 +1,45 @@
+"""leave lookup indexes and unique balance per year
+
+Revision ID: 8e41b6c0d2f5
+Revises: 3c9f2a1d7b40
+Create Date: 2026-10-17 10:03:17.552914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e41b6c0d2f5'
+down_revision: Union[str, Sequence[str], None] = '3c9f2a1d7b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_unique_constraint(table: str, name: str) -> bool:
+    constraints = sa.inspect(op.get_bind()).get_unique_constraints(table)
+    return any(constraint['name'] == name for constraint in constraints)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_leave_requests_user_status_dates', 'leave_requests',
+        ['user_id', 'status', 'start_date', 'end_date'], unique=False, if_not_exists=True
+    )
+    # Fails if duplicate (user_id, leave_type_id, year) balances already exist;
+    # merge those rows first. Tables created by create_all already have it.
+    if not _has_unique_constraint('leave_balances', 'uq_leave_balances_user_type_year'):
+        with op.batch_alter_table('leave_balances') as batch_op:
+            batch_op.create_unique_constraint(
+                'uq_leave_balances_user_type_year', ['user_id', 'leave_type_id', 'year']
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('leave_balances') as batch_op:
+        batch_op.drop_constraint('uq_leave_balances_user_type_year', type_='unique')
+    op.drop_index('ix_leave_requests_user_status_dates', table_name='leave_requests', if_exists=True)
@@ -0,0 +1,47 @@
+"""department absence summary table
+
+Revision ID: b7d3e9a4c1f6
+Revises: 8e41b6c0d2f5
+Create Date: 2026-10-17 14:22:41.308116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3e9a4c1f6'
+down_revision: Union[str, Sequence[str], None] = '8e41b6c0d2f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Starts empty: run POST /admin/reports/department-absence:rebuild once
+    # after upgrading to fill it from existing leave requests.
+    op.create_table(
+        'department_absence_days',
+        sa.Column('department_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('absent_count', sa.Integer(), nullable=False),
+        sa.Column('pending_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['department_id'], ['departments.department_id']),
+        sa.PrimaryKeyConstraint('department_id', 'day'),
+        if_not_exists=True
+    )
+    op.create_index(
+        'ix_department_absence_days_covering', 'department_absence_days',
+        ['department_id', 'day'], unique=False,
+        postgresql_include=['absent_count', 'pending_count'], if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        'ix_department_absence_days_covering', table_name='department_absence_days', if_exists=True
+    )
+    op.drop_table('department_absence_days', if_exists=True)
@@ -0,0 +1,47 @@
+"""refresh token sessions table
+
+Revision ID: d2a8f5c3e917
+Revises: b7d3e9a4c1f6
+Create Date: 2026-10-17 17:05:12.481327
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a8f5c3e917'
+down_revision: Union[str, Sequence[str], None] = 'b7d3e9a4c1f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'auth_sessions',
+        sa.Column('session_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('token_hash', sa.LargeBinary(length=32), nullable=False),
+        sa.Column('previous_token_hash', sa.LargeBinary(length=32), nullable=True),
+        sa.Column('expires_at', sa.TIMESTAMP(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('session_id'),
+        sa.UniqueConstraint('token_hash'),
+        if_not_exists=True
+    )
+    op.create_index('ix_auth_sessions_user_id', 'auth_sessions', ['user_id'], unique=False, if_not_exists=True)
+    op.create_index(
+        'ix_auth_sessions_previous_token_hash', 'auth_sessions', ['previous_token_hash'],
+        unique=False, if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_auth_sessions_previous_token_hash', table_name='auth_sessions', if_exists=True)
+    op.drop_index('ix_auth_sessions_user_id', table_name='auth_sessions', if_exists=True)
+    op.drop_table('auth_sessions', if_exists=True)
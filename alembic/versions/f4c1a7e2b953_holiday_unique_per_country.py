@@ -0,0 +1,62 @@
+"""holidays unique per date and country
+
+Revision ID: f4c1a7e2b953
+Revises: d2a8f5c3e917
+Create Date: 2026-10-17 18:40:26.913204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c1a7e2b953'
+down_revision: Union[str, Sequence[str], None] = 'd2a8f5c3e917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _unique_constraints(columns: list[str]) -> list[dict]:
+    constraints = sa.inspect(op.get_bind()).get_unique_constraints('holidays')
+    return [constraint for constraint in constraints if constraint['column_names'] == columns]
+
+
+def _holidays_table(*constraints) -> sa.Table:
+    return sa.Table(
+        'holidays', sa.MetaData(),
+        sa.Column('holiday_id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('holiday_date', sa.Date(), nullable=False),
+        sa.Column('country_code', sa.CHAR(length=2)),
+        *constraints
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _unique_constraints(['holiday_date', 'country_code']):
+        return
+    old_constraints = _unique_constraints(['holiday_date'])
+    if op.get_bind().dialect.name == 'sqlite':
+        # The old constraint is unnamed on SQLite and cannot be dropped, so
+        # rebuild the table from a definition that leaves it out.
+        with op.batch_alter_table('holidays', recreate='always', copy_from=_holidays_table()) as batch_op:
+            batch_op.create_unique_constraint('uq_holidays_date_country', ['holiday_date', 'country_code'])
+        return
+    for constraint in old_constraints:
+        op.drop_constraint(constraint['name'], 'holidays', type_='unique')
+    op.create_unique_constraint('uq_holidays_date_country', 'holidays', ['holiday_date', 'country_code'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Fails if two countries have a holiday on the same date; delete one first.
+    if op.get_bind().dialect.name == 'sqlite':
+        old_table = _holidays_table(sa.UniqueConstraint('holiday_date'))
+        with op.batch_alter_table('holidays', recreate='always', copy_from=old_table):
+            pass
+        return
+    op.drop_constraint('uq_holidays_date_country', 'holidays', type_='unique')
+    op.create_unique_constraint('holidays_holiday_date_key', 'holidays', ['holiday_date'])
@@ -1,22 +1,292 @@
 # app/database.py
-from sqlalchemy import create_engine
+import itertools
+import threading
+import time
+from typing import Union
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.config import settings
+from app.metrics import Histogram
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+# Either kind of session handed out by get_db, depending on DATABASE_MODE
+AnySession = Union[Session, AsyncSession]
+
+def to_async_url(url: str) -> str:
+    """Swaps the DBAPI driver of a sync database URL for its asyncio counterpart."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases.")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+class PoolMetrics:
+    """Checkout wait and hold times for one engine's connection pool."""
+    def __init__(self, name: str, engine: Engine, max_overflow: int | None = None):
+        self.name = name
+        self.engine = engine
+        self.max_overflow = max_overflow
+        self.timeouts = 0
+        self.wait_seconds = Histogram()
+        self.hold_seconds = Histogram()
+        self._lock = threading.Lock()
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        pool = self.engine.pool
+        report = {"name": self.name, "pool_class": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            report.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            })
+            if self.max_overflow is not None:
+                report["max_overflow"] = self.max_overflow
+        with self._lock:
+            timeouts = self.timeouts
+        report.update({
+            "timeouts": timeouts,
+            "wait_seconds": self.wait_seconds.snapshot(),
+            "hold_seconds": self.hold_seconds.snapshot(),
+        })
+        return report
+
+# One entry per engine, reported by GET /admin/stats/db-pool
+pool_metrics: dict[str, PoolMetrics] = {}
+
+class _TimedCheckoutMixin:
+    """Times how long each checkout waits for a free connection."""
+    metrics: PoolMetrics | None = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout()
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.wait_seconds.observe(time.perf_counter() - started)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    if make_url(url).get_backend_name() == "sqlite":
+        return {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+def instrument_engine(engine: Engine, name: str) -> PoolMetrics:
+    # Instrumented pools are the ones engine_options sized from settings
+    instrumented = isinstance(engine.pool, _TimedCheckoutMixin)
+    metrics = PoolMetrics(name, engine, settings.DB_MAX_OVERFLOW if instrumented else None)
+    if instrumented:
+        engine.pool.metrics = metrics
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            metrics.hold_seconds.observe(time.perf_counter() - checked_out_at)
+
+    pool_metrics[name] = metrics
+    return metrics
 
 # Create the SQLAlchemy engine
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+instrument_engine(engine, "primary")
+
+# Create a session factory. Objects stay loaded after commit so that
+# responses can be serialized without another round trip in either mode.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# The asyncio engine is only built in async mode, so asyncpg/aiosqlite
+# are not needed otherwise. Scripts and migrations always use `engine`.
+async_engine = None
+AsyncSessionLocal = None
+if settings.DATABASE_MODE == "async":
+    async_url = settings.ASYNC_DATABASE_URL or to_async_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(async_url, **engine_options(async_url, is_async=True))
+    instrument_engine(async_engine.sync_engine, "primary-async")
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+elif settings.DATABASE_MODE != "sync":
+    raise ValueError(f"DATABASE_MODE must be 'sync' or 'async', got '{settings.DATABASE_MODE}'.")
+
+class ReplicaSet:
+    """
+    Session factories for the read replicas, handed out round-robin. A replica
+    that fails its connection check is skipped for REPLICA_RETRY_SECONDS.
+    """
+    def __init__(self, factories: list[tuple[str, sessionmaker | async_sessionmaker]]):
+        self._factories = factories
+        self._down_until = {name: 0.0 for name, _ in factories}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self._factories)
 
-# Create a session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    def candidates(self):
+        """Healthy replicas in round-robin order, starting from the next one."""
+        if not self._factories:
+            return []
+        with self._lock:
+            start = next(self._counter) % len(self._factories)
+        now = time.monotonic()
+        ordered = self._factories[start:] + self._factories[:start]
+        return [(name, factory) for name, factory in ordered if self._down_until[name] <= now]
+
+    def mark_down(self, name: str) -> None:
+        self._down_until[name] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+
+def _build_replicas() -> ReplicaSet:
+    factories = []
+    urls = [url.strip() for url in settings.READ_REPLICA_URLS.split(",") if url.strip()]
+    for i, url in enumerate(urls):
+        name = f"replica-{i}"
+        if settings.DATABASE_MODE == "async":
+            async_url = to_async_url(url)
+            replica_engine = create_async_engine(async_url, **engine_options(async_url, is_async=True))
+            instrument_engine(replica_engine.sync_engine, name)
+            factories.append((name, async_sessionmaker(replica_engine, autoflush=False, expire_on_commit=False)))
+        else:
+            replica_engine = create_engine(url, **engine_options(url))
+            instrument_engine(replica_engine, name)
+            factories.append((name, sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=replica_engine)))
+    return ReplicaSet(factories)
+
+replicas = _build_replicas()
+
+# Clients that wrote recently read from the primary until the window passes,
+# so they see their own writes despite replication lag. The pin is handed to
+# the client (see ReadYourWritesMiddleware) as a cookie holding the epoch
+# millisecond it lasts until, and sent back as that cookie or as a header, so
+# every worker honours it.
+PRIMARY_PIN_COOKIE = "leafman_primary_until"
+PRIMARY_PIN_HEADER = "X-Primary-Until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+def primary_pin_headers() -> list[tuple[str, str]]:
+    """Response headers pinning the client to the primary from now on."""
+    window = settings.READ_YOUR_WRITES_SECONDS
+    until = int((time.time() + window) * 1000)
+    return [
+        ("set-cookie", f"{PRIMARY_PIN_COOKIE}={until}; Max-Age={window}; Path=/; HttpOnly; SameSite=Lax"),
+        (PRIMARY_PIN_HEADER.lower(), str(until)),
+    ]
+
+def _read_from_primary(request: Request) -> bool:
+    if not replicas:
+        return True
+    pinned_until = request.cookies.get(PRIMARY_PIN_COOKIE) or request.headers.get(PRIMARY_PIN_HEADER)
+    try:
+        return pinned_until is not None and int(pinned_until) > time.time() * 1000
+    except ValueError:
+        return False
 
 # Create a base class for declarative models
 Base = declarative_base()
 
-# Dependency to get a DB session
-def get_db():
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_sync_read_db(request: Request):
+    db = None
+    if not _read_from_primary(request):
+        for name, factory in replicas.candidates():
+            db = factory()
+            try:
+                # Check out a connection now (pre-ping validates it) so a dead
+                # replica is detected here rather than mid-query.
+                db.connection()
+                break
+            except exc.SQLAlchemyError:
+                db.close()
+                db = None
+                replicas.mark_down(name)
+    if db is None:
+        db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(request: Request):
+    db = None
+    if not _read_from_primary(request):
+        for name, factory in replicas.candidates():
+            db = factory()
+            try:
+                await db.connection()
+                break
+            except (exc.SQLAlchemyError, OSError):
+                await db.close()
+                db = None
+                replicas.mark_down(name)
+    if db is None:
+        db = AsyncSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+# Dependency to get a DB session
+get_db = get_async_db if AsyncSessionLocal is not None else get_sync_db
+# Dependency for read-only routes: a replica when one is configured and
+# healthy, otherwise the primary
+get_read_db = get_async_read_db if AsyncSessionLocal is not None else get_sync_read_db
+
+async def run(db: AnySession, fn, *args, **kwargs):
+    """
+    Calls a service function that takes a sync Session as its first argument.
+    In async mode it runs on the event loop through AsyncSession.run_sync, so the
+    driver I/O is non-blocking; in sync mode it runs on the threadpool, as a
+    plain `def` route would.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
@@ -1,40 +1,54 @@
 # app/dependencies.py
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from jose import JWTError, jwt
+from jose import JWTError
 
-from app.database import get_db
-from app.config import settings
+from app import database
 from app.models import all_models as m
 from app.schemas import token_schemas as ts
+from app.services import auth_service
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> m.User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+async def get_token_claims(token: str = Depends(oauth2_scheme)) -> dict:
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = ts.TokenData(email=email)
+        claims = auth_service.decode_access_token(token)
     except JWTError:
-        raise credentials_exception
-    
-    user = db.query(m.User).filter(m.User.email == token_data.email).first()
+        raise _credentials_exception()
+    if claims.get("sub") is None:
+        raise _credentials_exception()
+    return claims
+
+async def get_current_user(claims: dict = Depends(get_token_claims), db: database.AnySession = Depends(database.get_db)) -> m.User:
+    token_data = ts.TokenData(email=claims["sub"])
+
+    user = auth_service.get_cached_principal(token_data.email)
+    if user is not None:
+        return user
+
+    generation = auth_service.principal_generation()
+    user = await database.run(db, auth_service.get_user_by_email, token_data.email)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    auth_service.cache_principal(user, generation)
     return user
 
-def get_current_admin_user(current_user: m.User = Depends(get_current_user)) -> m.User:
+async def get_current_admin_user(current_user: m.User = Depends(get_current_user)) -> m.User:
+    """
+    The role comes from the verified principal cache or the users table, never
+    from the token's role claim, so a demotion or removal is not outlived by
+    tokens issued before it.
+    """
     if current_user.role != "Admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="The user doesn't have enough privileges"
         )
-    return current_user
\ No newline at end of file
+    return current_user
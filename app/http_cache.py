@@ -0,0 +1,53 @@
+# app/http_cache.py
+import hashlib
+from typing import Any, Awaitable, Callable
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from app.cache import TTLCache
+from app.config import settings
+
+# Keys of the reference lists cached below
+LEAVE_TYPES = "leave-types"
+DEPARTMENTS = "departments"
+
+# Serialized reference data, dropped by the services that change it. The TTL
+# only bounds staleness for other worker processes.
+reference_cache = TTLCache(maxsize=16, ttl=settings.REFERENCE_CACHE_TTL_SECONDS)
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+async def cached_json_response(
+    request: Request,
+    key: str,
+    load: Callable[[], Awaitable[Any]],
+    adapter: TypeAdapter,
+    cache_control: str
+) -> Response:
+    """
+    Serves a rarely-changing list from pre-serialized bytes with a strong
+    ETag, answering a matching If-None-Match with 304 and no body. `load` is
+    only awaited on a cache miss, and its result is not cached if the cache
+    was invalidated while it ran, since it may predate the change.
+    """
+    entry = reference_cache.get(key)
+    if entry is None:
+        generation = reference_cache.generation
+        body = adapter.dump_json(await load())
+        entry = (body, '"' + hashlib.sha256(body).hexdigest() + '"')
+        reference_cache.set(key, entry, generation=generation)
+    body, etag = entry
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
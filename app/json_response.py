@@ -0,0 +1,24 @@
+# app/json_response.py
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi import Response
+
+def _default(value: Any):
+    # Pydantic writes Decimal as a string in JSON; keep the same wire format
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+def json_response(content: Any, headers: dict[str, str] | None = None) -> Response:
+    """
+    Emits already-shaped data with orjson, skipping FastAPI's response model
+    validation. Only for content the service built to match the declared
+    response model; tests/test_list_responses.py holds the leave request
+    listings to theirs.
+    """
+    return Response(content=dumps(content), media_type="application/json", headers=headers)
@@ -1,11 +1,12 @@
 # app/main.py
 
-from fastapi import FastAPI, Request
-import json 
+from fastapi import FastAPI
 
 from app.database import engine
+from app.metrics import request_metrics
+from app.middleware import ReadYourWritesMiddleware, RequestMetricsMiddleware
 from app.models import all_models
-from app.routers import auth_router, user_router, leave_router, admin_router
+from app.routers import auth_router, user_router, leave_router, admin_router, metrics_router, report_router
 
 all_models.Base.metadata.create_all(bind=engine)
 
@@ -25,23 +26,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # GET, POST, PUT, DELETE, OPTIONS
     allow_headers=["*"],  # Authorization, Content-Type, etc.
+    expose_headers=["X-Next-Cursor", "X-Primary-Until"],  # keyset pagination, read-your-writes
 )
 
-@app.middleware("http")
-async def log_headers_middleware(request: Request, call_next):
-    # We print this BEFORE the request is processed.
-    print(f"[SERVER DEBUG] Request received for: {request.url.path}")
-    # Pretty-print the headers
-    print(f"[SERVER DEBUG] Incoming Headers: {json.dumps(dict(request.headers), indent=2)}")
-    
-    response = await call_next(request)
-    return response
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(RequestMetricsMiddleware, metrics=request_metrics)
 
 
 app.include_router(auth_router.router)
 app.include_router(user_router.router)
 app.include_router(leave_router.router)
 app.include_router(admin_router.router)
+app.include_router(report_router.router)
+app.include_router(metrics_router.router)
 
 @app.get("/", tags=["Root"])
 def read_root():
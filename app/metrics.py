@@ -0,0 +1,85 @@
+# app/metrics.py
+import threading
+from bisect import bisect_left
+from typing import Iterable
+
+# Upper bounds in seconds, suitable for both pool waits and request latency
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Counts are kept per bucket and reported
+    cumulatively (Prometheus-style), so observing is a bisect and two adds.
+    """
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative, running = {}, 0
+        for bound, count in zip(self.buckets, counts):
+            running += count
+            cumulative[str(bound)] = running
+        running += counts[-1]
+        cumulative["+Inf"] = running
+        return {"count": running, "sum": round(total, 6), "buckets": cumulative}
+
+class RequestMetrics:
+    """Per-route latency histograms, per-status counters and an in-flight gauge."""
+    def __init__(self):
+        self.in_flight = 0
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.responses: dict[tuple[str, str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, route: str, status_code: int, seconds: float) -> None:
+        key = (method, route)
+        histogram = self.latency.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.latency.setdefault(key, Histogram())
+        histogram.observe(seconds)
+        with self._lock:
+            status_key = (method, route, status_code)
+            self.responses[status_key] = self.responses.get(status_key, 0) + 1
+
+request_metrics = RequestMetrics()
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class PrometheusText:
+    """Builds a Prometheus text-format (v0.0.4) exposition."""
+    def __init__(self):
+        self._lines: list[str] = []
+
+    def declare(self, name: str, kind: str, help_text: str) -> None:
+        self._lines.append(f"# HELP {name} {help_text}")
+        self._lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value, labels: dict | None = None) -> None:
+        if labels:
+            rendered = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+            name = f"{name}{{{rendered}}}"
+        self._lines.append(f"{name} {value}")
+
+    def histogram(self, name: str, snapshot: dict, labels: dict | None = None) -> None:
+        labels = labels or {}
+        for bound, count in snapshot["buckets"].items():
+            self.sample(f"{name}_bucket", count, {**labels, "le": bound})
+        self.sample(f"{name}_sum", snapshot["sum"], labels)
+        self.sample(f"{name}_count", snapshot["count"], labels)
+
+    def render(self) -> str:
+        return "\n".join(self._lines) + "\n"
@@ -0,0 +1,82 @@
+# app/middleware.py
+import logging
+import random
+import time
+
+from app import database
+from app.config import settings
+from app.metrics import RequestMetrics
+
+logger = logging.getLogger("app.requests")
+
+REDACTED_HEADERS = {"authorization", "proxy-authorization", "cookie", "set-cookie", "x-api-key"}
+
+class RequestMetricsMiddleware:
+    """
+    Pure ASGI middleware that times every HTTP request and records it against
+    its route template, so the overhead is a clock read and a few counter
+    updates. Header logging is opt-in, sampled and redacted.
+    """
+    def __init__(self, app, metrics: RequestMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if settings.LOG_REQUEST_HEADERS and random.random() < settings.REQUEST_HEADER_LOG_SAMPLE_RATE:
+            _log_headers(scope)
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.metrics.in_flight -= 1
+            # Label by route template, not raw path, to keep cardinality bounded
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "<unmatched>"
+            self.metrics.observe(scope["method"], route_path, status_code, elapsed)
+
+class ReadYourWritesMiddleware:
+    """
+    Pins a client to the primary once one of its writes has succeeded. The
+    pin is set as a cookie and header on the response, so it starts after the handler
+    has committed; streamed bulk jobs commit while their body is still being
+    sent, so for those the window starts when the stream does.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in database.SAFE_METHODS or not database.replicas:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_pin(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                message["headers"] = [
+                    *message.get("headers", []),
+                    *((name.encode("latin-1"), value.encode("latin-1")) for name, value in database.primary_pin_headers()),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
+
+def _log_headers(scope) -> None:
+    headers = {}
+    for raw_name, raw_value in scope["headers"]:
+        name = raw_name.decode("latin-1")
+        headers[name] = "[REDACTED]" if name in REDACTED_HEADERS else raw_value.decode("latin-1")
+    logger.info("%s %s headers=%s", scope["method"], scope["path"], headers)
@@ -1,7 +1,7 @@
 # app/models/all_models.py
 from sqlalchemy import (
     create_engine, Column, Integer, String, Date, Boolean,
-    ForeignKey, TIMESTAMP, TEXT, DECIMAL, CHAR
+    ForeignKey, TIMESTAMP, TEXT, DECIMAL, CHAR, Index, LargeBinary, UniqueConstraint
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -44,6 +44,10 @@ class LeaveType(Base):
 
 class LeaveBalance(Base):
     __tablename__ = 'leave_balances'
+    __table_args__ = (
+        # One balance per user, leave type and year; also serves the balance lookup
+        UniqueConstraint('user_id', 'leave_type_id', 'year', name='uq_leave_balances_user_type_year'),
+    )
     balance_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
     leave_type_id = Column(Integer, ForeignKey('leave_types.leave_type_id'), nullable=False)
@@ -56,6 +60,13 @@ class LeaveBalance(Base):
 
 class LeaveRequest(Base):
     __tablename__ = 'leave_requests'
+    __table_args__ = (
+        # Keyset pagination: admin listing by status, and a user's own history
+        Index('ix_leave_requests_status_applied_at', 'status', 'applied_at', 'request_id'),
+        Index('ix_leave_requests_user_id_applied_at', 'user_id', 'applied_at', 'request_id'),
+        # Overlap check in apply_for_leave
+        Index('ix_leave_requests_user_status_dates', 'user_id', 'status', 'start_date', 'end_date'),
+    )
     request_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
     leave_type_id = Column(Integer, ForeignKey('leave_types.leave_type_id'), nullable=False)
@@ -84,7 +95,46 @@ class LeaveRequest(Base):
 
 class Holiday(Base):
     __tablename__ = 'holidays'
+    __table_args__ = (
+        # One holiday per date and country; also serves the calendar's date range scan
+        UniqueConstraint('holiday_date', 'country_code', name='uq_holidays_date_country'),
+    )
     holiday_id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
-    holiday_date = Column(Date, unique=True, nullable=False)
-    country_code = Column(CHAR(2))
\ No newline at end of file
+    holiday_date = Column(Date, nullable=False)
+    country_code = Column(CHAR(2))
+
+
+class DepartmentAbsenceDay(Base):
+    """
+    How many people in a department are on approved or pending leave on a
+    given day. Kept up to date as requests are filed and decided; see
+    report_service.rebuild_department_absence to recompute it.
+    """
+    __tablename__ = 'department_absence_days'
+    __table_args__ = (
+        # Lets date-range reads for a department be index-only scans on PostgreSQL
+        Index(
+            'ix_department_absence_days_covering', 'department_id', 'day',
+            postgresql_include=['absent_count', 'pending_count']
+        ),
+    )
+    department_id = Column(Integer, ForeignKey('departments.department_id'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    absent_count = Column(Integer, nullable=False, default=0)
+    pending_count = Column(Integer, nullable=False, default=0)
+
+
+class AuthSession(Base):
+    """
+    One row per refresh-token session. Only the SHA-256 of the current
+    refresh token is stored; rotation replaces it in place and keeps the
+    replaced hash, so that token being presented again can be recognised.
+    """
+    __tablename__ = 'auth_sessions'
+    session_id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False, index=True)
+    token_hash = Column(LargeBinary(32), nullable=False, unique=True)
+    previous_token_hash = Column(LargeBinary(32), index=True)
+    expires_at = Column(TIMESTAMP, nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now())
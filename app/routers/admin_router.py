@@ -1,12 +1,15 @@
 # app/routers/admin_router.py
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from typing import List
 
-from app import database, dependencies, models, schemas
-from app.services import admin_service, leave_service
-from sqlalchemy.orm import joinedload
+from app import database, dependencies, http_cache, models, schemas
+from app.config import settings
+from app.json_response import json_response
+from app.services import admin_service, auth_service, calendar_service, leave_service, report_service, session_service
 
 router = APIRouter(
     prefix="/admin",
@@ -15,58 +18,163 @@ router = APIRouter(
 )
 
 @router.post("/users", response_model=schemas.user_schemas.UserResponse, status_code=201)
-def add_new_user(
+async def add_new_user(
     user: schemas.user_schemas.UserCreate,
-    db: Session = Depends(database.get_db)
+    db: database.AnySession = Depends(database.get_db)
 ):
-    return admin_service.create_user(db=db, user=user)
+    password_hash = await auth_service.get_password_hash_async(user.password)
+    return await database.run(db, admin_service.create_user, user=user, password_hash=password_hash)
+
+@router.post("/users:import")
+async def import_users(
+    file: UploadFile,
+    format: str | None = Query(None, pattern="^(csv|jsonl)$")
+):
+    """
+    Bulk-creates users from a CSV or JSONL upload (columns as for POST /admin/users).
+    Streams NDJSON progress, per-row errors and a final summary.
+    """
+    fmt = format or ("csv" if (file.filename or "").lower().endswith(".csv") else "jsonl")
+    return StreamingResponse(
+        admin_service.import_users(database.SessionLocal, file.file, fmt, settings.USER_IMPORT_CHUNK_SIZE),
+        media_type="application/x-ndjson"
+    )
+
+@router.delete("/users/{user_id}/sessions", status_code=204)
+async def revoke_user_sessions(user_id: int, db: database.AnySession = Depends(database.get_db)):
+    """Signs a user out everywhere: their refresh tokens stop working. Issued access tokens run until they expire."""
+    await database.run(db, session_service.revoke_user_sessions, user_id)
+
+@router.post("/leave-balances:rollover")
+async def rollover_leave_balances(
+    from_year: int = Query(..., ge=1900, le=9998),
+    after_user_id: int = Query(0, ge=0)
+):
+    """
+    Creates next year's leave balances, carrying unused days forward where the
+    leave type allows it. Safe to re-run; streams NDJSON progress records.
+    """
+    return StreamingResponse(
+        admin_service.rollover_leave_balances(
+            database.SessionLocal, from_year, settings.BALANCE_ROLLOVER_CHUNK_SIZE, after_user_id
+        ),
+        media_type="application/x-ndjson"
+    )
 
 @router.get("/leave-requests", response_model=List[schemas.leave_schemas.AdminLeaveRequestResponse])
-def list_all_leave_requests(
-    db: Session = Depends(database.get_db),
+async def list_all_leave_requests(
+    db: database.AnySession = Depends(database.get_read_db),
     status: str | None = None,
     page: int = Query(1, ge=1),
-    limit: int = Query(20, le=100)
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None
 ):
-    query = db.query(models.all_models.LeaveRequest).options(
-        joinedload(models.all_models.LeaveRequest.user)
+    requests, next_cursor = await database.run(
+        db, leave_service.list_leave_requests, status=status, page=page, limit=limit, cursor=cursor
     )
-    if status:
-        query = query.filter(models.all_models.LeaveRequest.status == status)
-    
-    offset = (page - 1) * limit
-    return query.order_by(models.all_models.LeaveRequest.applied_at.desc()).offset(offset).limit(limit).all()
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return json_response(requests, headers)
+
+@router.get("/leave-requests/export")
+async def export_leave_requests(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    date_from: date | None = Query(None, alias="from"),
+    date_to: date | None = Query(None, alias="to"),
+    status: str | None = None
+):
+    """
+    Streams every leave request overlapping [from, to], joined with its user
+    and leave type, as CSV or NDJSON.
+    """
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' cannot be after 'to'.")
+    period = "-".join(str(d) for d in (date_from, date_to) if d) or "all"
+    return StreamingResponse(
+        leave_service.export_leave_requests(
+            database.SessionLocal, format, date_from, date_to, status, settings.EXPORT_BATCH_SIZE
+        ),
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="leave-requests-{period}.{format}"'}
+    )
+
 @router.patch("/leave-requests/{request_id}", response_model=schemas.leave_schemas.LeaveRequestResponse)
-def update_leave_request_status(
+async def update_leave_request_status(
     request_id: int,
     approval: schemas.leave_schemas.LeaveApproval,
-    db: Session = Depends(database.get_db),
+    db: database.AnySession = Depends(database.get_db),
+    admin_user: models.all_models.User = Depends(dependencies.get_current_admin_user)
+):
+    return await database.run(db, leave_service.process_leave_request, request_id, approval, admin_user)
+
+@router.patch("/leave-requests:batch", response_model=schemas.leave_schemas.BatchLeaveApprovalResponse)
+async def update_leave_request_statuses(
+    batch: schemas.leave_schemas.BatchLeaveApproval,
+    db: database.AnySession = Depends(database.get_db),
     admin_user: models.all_models.User = Depends(dependencies.get_current_admin_user)
 ):
-    return leave_service.process_leave_request(db, request_id, approval, admin_user)
+    return await database.run(db, leave_service.process_leave_requests_batch, batch.decisions, admin_user)
 
 @router.post("/leave-types", response_model=schemas.leave_schemas.LeaveTypeResponse, status_code=201)
-def create_leave_type(
+async def create_leave_type(
     leave_type: schemas.leave_schemas.LeaveTypeCreate,
-    db: Session = Depends(database.get_db)
+    db: database.AnySession = Depends(database.get_db)
 ):
-    db_leave_type = models.all_models.LeaveType(**leave_type.model_dump())
-    db.add(db_leave_type)
-    db.commit()
-    db.refresh(db_leave_type)
-    return db_leave_type
+    return await database.run(db, admin_service.create_leave_type, leave_type)
+
+_departments_adapter = TypeAdapter(List[schemas.leave_schemas.DepartmentResponse])
 
 @router.get("/departments/", response_model=List[schemas.leave_schemas.DepartmentResponse])
-def list_departments(db: Session = Depends(database.get_db)):
-    return db.query(models.all_models.Department).all()
+async def list_departments(request: Request, db: database.AnySession = Depends(database.get_db)):
+    # Admin-only, so shared caches must not store it
+    return await http_cache.cached_json_response(
+        request,
+        http_cache.DEPARTMENTS,
+        lambda: database.run(db, admin_service.list_departments),
+        _departments_adapter,
+        f"private, max-age={settings.REFERENCE_CACHE_MAX_AGE_SECONDS}"
+    )
 
 @router.post("/departments", response_model=schemas.leave_schemas.DepartmentResponse, status_code=201)
-def create_department(
+async def create_department(
     department: schemas.leave_schemas.DepartmentCreate,
-    db: Session = Depends(database.get_db)
+    db: database.AnySession = Depends(database.get_db)
+):
+    return await database.run(db, admin_service.create_department, department)
+
+@router.get("/holidays", response_model=List[schemas.leave_schemas.HolidayResponse])
+async def list_holidays(
+    year: int | None = Query(None, ge=1900, le=9999),
+    db: database.AnySession = Depends(database.get_read_db)
+):
+    return await database.run(db, admin_service.list_holidays, year)
+
+@router.post("/holidays", response_model=schemas.leave_schemas.HolidayResponse, status_code=201)
+async def create_holiday(
+    holiday: schemas.leave_schemas.HolidayCreate,
+    db: database.AnySession = Depends(database.get_db)
 ):
-    db_department = models.all_models.Department(**department.model_dump())
-    db.add(db_department)
-    db.commit()
-    db.refresh(db_department)
-    return db_department
\ No newline at end of file
+    return await database.run(db, admin_service.create_holiday, holiday)
+
+@router.delete("/holidays/{holiday_id}", status_code=204)
+async def delete_holiday(holiday_id: int, db: database.AnySession = Depends(database.get_db)):
+    await database.run(db, admin_service.delete_holiday, holiday_id)
+
+@router.get("/stats/calendar-cache")
+async def get_calendar_cache_stats():
+    return calendar_service.calendar_cache.stats()
+
+@router.get("/stats/report-cache")
+async def get_report_cache_stats():
+    return report_service.report_cache.stats()
+
+@router.get("/stats/principal-cache")
+async def get_principal_cache_stats():
+    return auth_service.principal_cache.stats()
+
+@router.get("/stats/token-cache")
+async def get_token_cache_stats():
+    return auth_service.token_claims_cache.stats()
+
+@router.get("/stats/db-pool")
+async def get_db_pool_stats():
+    return [metrics.snapshot() for metrics in database.pool_metrics.values()]
@@ -1,12 +1,12 @@
 # app/routers/auth_router.py
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
 from datetime import timedelta
 
-from app import database, models
+from app import database
+from app.models import all_models as m
 from app.schemas import token_schemas
-from app.services import auth_service
+from app.services import auth_service, session_service
 from app.config import settings
 
 router = APIRouter(
@@ -14,17 +14,37 @@ router = APIRouter(
     tags=["Authentication"]
 )
 
+def _access_token(user: m.User) -> str:
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return auth_service.create_access_token(
+        data={"sub": user.email, "user_id": user.user_id, "role": user.role}, expires_delta=access_token_expires
+    )
+
 @router.post("/token", response_model=token_schemas.Token)
-def login_for_access_token(db: Session = Depends(database.get_db), form_data: OAuth2PasswordRequestForm = Depends()):
-    user = db.query(models.all_models.User).filter(models.all_models.User.email == form_data.username).first()
-    if not user or not auth_service.verify_password(form_data.password, user.password_hash):
+async def login_for_access_token(db: database.AnySession = Depends(database.get_db), form_data: OAuth2PasswordRequestForm = Depends()):
+    user = await database.run(db, auth_service.get_user_by_email, form_data.username)
+    if not user or not await auth_service.verify_password_async(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = auth_service.create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    refresh_token = await database.run(db, session_service.issue_refresh_token, user.user_id)
+    return {"access_token": _access_token(user), "token_type": "bearer", "refresh_token": refresh_token}
+
+@router.post("/refresh", response_model=token_schemas.Token)
+async def refresh_access_token(request: token_schemas.RefreshRequest, db: database.AnySession = Depends(database.get_db)):
+    """Swaps a refresh token for a new access token and a new refresh token; the old one stops working."""
+    renewed = await database.run(db, session_service.rotate_refresh_token, request.refresh_token)
+    if renewed is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user, refresh_token = renewed
+    return {"access_token": _access_token(user), "token_type": "bearer", "refresh_token": refresh_token}
+
+@router.post("/logout", status_code=204)
+async def logout(request: token_schemas.RefreshRequest, db: database.AnySession = Depends(database.get_db)):
+    await database.run(db, session_service.revoke_refresh_token, request.refresh_token)
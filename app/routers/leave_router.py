@@ -1,10 +1,12 @@
 # app/routers/leave_router.py
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request
+from pydantic import TypeAdapter
 from typing import List
 
-from app import database, dependencies, models, schemas
+from app import database, dependencies, http_cache, models, schemas
+from app.config import settings
+from app.json_response import json_response
 from app.services import leave_service
 
 router = APIRouter(
@@ -12,26 +14,37 @@ router = APIRouter(
     tags=["Leave Requests"]
 )
 
+_leave_types_adapter = TypeAdapter(List[schemas.leave_schemas.LeaveTypeResponse])
+
 @router.get("/types", response_model=List[schemas.leave_schemas.LeaveTypeResponse])
-def get_all_leave_types(db: Session = Depends(database.get_db)):
-    return db.query(models.all_models.LeaveType).all()
+async def get_all_leave_types(request: Request, db: database.AnySession = Depends(database.get_db)):
+    return await http_cache.cached_json_response(
+        request,
+        http_cache.LEAVE_TYPES,
+        lambda: database.run(db, leave_service.get_leave_types),
+        _leave_types_adapter,
+        f"public, max-age={settings.REFERENCE_CACHE_MAX_AGE_SECONDS}"
+    )
 
 @router.post("/", response_model=schemas.leave_schemas.LeaveRequestResponse, status_code=201)
-def create_leave_request(
+async def create_leave_request(
     request: schemas.leave_schemas.LeaveRequestCreate,
-    db: Session = Depends(database.get_db),
+    db: database.AnySession = Depends(database.get_db),
     current_user: models.all_models.User = Depends(dependencies.get_current_user)
 ):
-    return leave_service.apply_for_leave(db=db, user=current_user, request=request)
+    return await database.run(db, leave_service.apply_for_leave, user=current_user, request=request)
 
 @router.get("/", response_model=List[schemas.leave_schemas.LeaveRequestResponse])
-def get_my_leave_requests(
-    db: Session = Depends(database.get_db),
+async def get_my_leave_requests(
+    db: database.AnySession = Depends(database.get_read_db),
     current_user: models.all_models.User = Depends(dependencies.get_current_user),
     page: int = Query(1, ge=1),
-    limit: int = Query(20, le=100)
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None
 ):
-    offset = (page - 1) * limit
-    return db.query(models.all_models.LeaveRequest).filter(
-        models.all_models.LeaveRequest.user_id == current_user.user_id
-    ).offset(offset).limit(limit).all()
\ No newline at end of file
+    requests, next_cursor = await database.run(
+        db, leave_service.get_user_leave_requests,
+        user_id=current_user.user_id, page=page, limit=limit, cursor=cursor
+    )
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return json_response(requests, headers)
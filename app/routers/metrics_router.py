@@ -0,0 +1,53 @@
+# app/routers/metrics_router.py
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app import database
+from app.metrics import PrometheusText, request_metrics
+from app.services import auth_service
+
+router = APIRouter(tags=["Monitoring"])
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    out = PrometheusText()
+
+    out.declare("http_requests_in_flight", "gauge", "Requests currently being served.")
+    out.sample("http_requests_in_flight", request_metrics.in_flight)
+
+    out.declare("http_requests_total", "counter", "Responses by route and status code.")
+    for (method, route, status_code), count in sorted(request_metrics.responses.items()):
+        out.sample("http_requests_total", count, {"method": method, "route": route, "status": status_code})
+
+    out.declare("http_request_duration_seconds", "histogram", "Request latency by route.")
+    for (method, route), histogram in sorted(request_metrics.latency.items()):
+        out.histogram("http_request_duration_seconds", histogram.snapshot(), {"method": method, "route": route})
+
+    pools = [metrics.snapshot() for metrics in database.pool_metrics.values()]
+    out.declare("db_pool_checked_out", "gauge", "Connections currently checked out of the pool.")
+    for pool in pools:
+        if "checked_out" in pool:
+            out.sample("db_pool_checked_out", pool["checked_out"], {"pool": pool["name"]})
+    out.declare("db_pool_overflow", "gauge", "Overflow connections currently open.")
+    for pool in pools:
+        if "overflow" in pool:
+            out.sample("db_pool_overflow", pool["overflow"], {"pool": pool["name"]})
+    out.declare("db_pool_timeouts_total", "counter", "Checkouts that timed out waiting for a connection.")
+    for pool in pools:
+        out.sample("db_pool_timeouts_total", pool["timeouts"], {"pool": pool["name"]})
+    out.declare("db_pool_wait_seconds", "histogram", "Time spent waiting for a pooled connection.")
+    for pool in pools:
+        out.histogram("db_pool_wait_seconds", pool["wait_seconds"], {"pool": pool["name"]})
+    out.declare("db_pool_hold_seconds", "histogram", "Time a connection stayed checked out.")
+    for pool in pools:
+        out.histogram("db_pool_hold_seconds", pool["hold_seconds"], {"pool": pool["name"]})
+
+    cache = auth_service.principal_cache.stats()
+    out.declare("principal_cache_hits_total", "counter", "Principal cache hits.")
+    out.sample("principal_cache_hits_total", cache["hits"])
+    out.declare("principal_cache_misses_total", "counter", "Principal cache misses.")
+    out.sample("principal_cache_misses_total", cache["misses"])
+    out.declare("principal_cache_size", "gauge", "Principals currently cached.")
+    out.sample("principal_cache_size", cache["size"])
+
+    return out.render()
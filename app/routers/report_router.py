@@ -0,0 +1,60 @@
+# app/routers/report_router.py
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List
+
+from app import database, dependencies
+from app.schemas import report_schemas
+from app.services import report_service
+
+router = APIRouter(
+    prefix="/admin/reports",
+    tags=["Reports"],
+    dependencies=[Depends(dependencies.get_current_admin_user)]
+)
+
+async def _cached_report(key: tuple, db: database.AnySession, fn, *args):
+    report = report_service.report_cache.get(key)
+    if report is None:
+        report = await database.run(db, fn, *args)
+        report_service.report_cache.set(key, report)
+    return report
+
+@router.get("/usage", response_model=report_schemas.UsageReport)
+async def get_usage_report(
+    year: int = Query(default_factory=lambda: date.today().year, ge=1900, le=9999),
+    department_id: int | None = None,
+    db: database.AnySession = Depends(database.get_read_db)
+):
+    return await _cached_report(("usage", year, department_id), db, report_service.usage_report, year, department_id)
+
+@router.get("/absence-calendar", response_model=report_schemas.AbsenceCalendar)
+async def get_absence_calendar(
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    department_id: int | None = None,
+    db: database.AnySession = Depends(database.get_read_db)
+):
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' cannot be after 'to'.")
+    if (date_to - date_from).days >= report_service.MAX_CALENDAR_DAYS:
+        raise HTTPException(status_code=400, detail=f"The range cannot exceed {report_service.MAX_CALENDAR_DAYS} days.")
+    return await _cached_report(
+        ("absence-calendar", date_from, date_to, department_id),
+        db, report_service.absence_calendar, date_from, date_to, department_id
+    )
+
+@router.get("/department-absence", response_model=List[report_schemas.DepartmentAbsenceDay])
+async def get_department_absence(
+    department_id: int,
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    db: database.AnySession = Depends(database.get_read_db)
+):
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' cannot be after 'to'.")
+    return await database.run(db, report_service.department_absence, department_id, date_from, date_to)
+
+@router.post("/department-absence:rebuild", response_model=report_schemas.AbsenceSummaryRebuild)
+async def rebuild_department_absence(db: database.AnySession = Depends(database.get_db)):
+    return {"rows": await database.run(db, report_service.rebuild_department_absence)}
@@ -3,11 +3,9 @@ from fastapi import APIRouter, Depends
 from typing import List
 from datetime import datetime
 
-from app import dependencies
+from app import database, dependencies
 from app.schemas import user_schemas, leave_schemas
-from app.database import get_db
 from app.services import leave_service
-from sqlalchemy.orm import Session
 
 router = APIRouter(
     prefix="/users",
@@ -16,13 +14,13 @@ router = APIRouter(
 )
 
 @router.get("/me", response_model=user_schemas.UserResponse)
-def read_users_me(current_user: user_schemas.UserResponse = Depends(dependencies.get_current_user)):
+async def read_users_me(current_user: user_schemas.UserResponse = Depends(dependencies.get_current_user)):
     return current_user
 
 @router.get("/me/balances", response_model=List[leave_schemas.LeaveBalanceResponse])
-def get_my_leave_balances(
-    db: Session = Depends(get_db),
+async def get_my_leave_balances(
+    db: database.AnySession = Depends(database.get_read_db),
     current_user: user_schemas.UserResponse = Depends(dependencies.get_current_user)
 ):
     current_year = datetime.now().year
-    return leave_service.get_leave_balances(db, user_id=current_user.user_id, year=current_year)
\ No newline at end of file
+    return await database.run(db, leave_service.get_leave_balances, user_id=current_user.user_id, year=current_year)
\ No newline at end of file
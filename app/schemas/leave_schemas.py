@@ -1,5 +1,5 @@
 # app/schemas/leave_schemas.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import date
 from decimal import Decimal
@@ -21,11 +21,15 @@ class LeaveTypeResponse(LeaveTypeBase):
     class Config:
         from_attributes = True
 
+# The working-day calendar is built a whole year at a time and cannot step
+# past date.max, so leave must end before the last representable year.
+LATEST_LEAVE_DATE = date(9998, 12, 31)
+
 # Schemas for LeaveRequest
 class LeaveRequestCreate(BaseModel):
     leave_type_id: int
-    start_date: date
-    end_date: date
+    start_date: date = Field(le=LATEST_LEAVE_DATE)
+    end_date: date = Field(le=LATEST_LEAVE_DATE)
     is_half_day: bool = False
     reason: Optional[str] = None
 
@@ -58,6 +62,23 @@ class LeaveApproval(BaseModel):
     status: str # "Approved" or "Rejected"
     approval_note: Optional[str] = None
 
+class LeaveDecision(LeaveApproval):
+    request_id: int
+
+class BatchLeaveApproval(BaseModel):
+    decisions: List[LeaveDecision] = Field(min_length=1, max_length=5000)
+
+class BatchLeaveResult(BaseModel):
+    request_id: int
+    ok: bool
+    status: Optional[str] = None
+    detail: Optional[str] = None
+
+class BatchLeaveApprovalResponse(BaseModel):
+    processed: int
+    failed: int
+    results: List[BatchLeaveResult]
+
 class DepartmentBase(BaseModel):
     name: str
 
@@ -69,6 +90,19 @@ class DepartmentResponse(DepartmentBase):
     class Config:
         from_attributes = True
 
+class HolidayBase(BaseModel):
+    name: str
+    holiday_date: date
+    country_code: Optional[str] = Field(None, min_length=2, max_length=2)
+
+class HolidayCreate(HolidayBase):
+    pass
+
+class HolidayResponse(HolidayBase):
+    holiday_id: int
+    class Config:
+        from_attributes = True
+
 class AdminLeaveRequestResponse(BaseModel):
     request_id: int
     user: UserInLeaveRequestResponse 
@@ -0,0 +1,40 @@
+# app/schemas/report_schemas.py
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date
+from decimal import Decimal
+
+class UsageReportRow(BaseModel):
+    department_id: Optional[int]
+    department: Optional[str]
+    leave_type_id: int
+    leave_type: str
+    employees: int
+    entitled_days: Decimal
+    used_days: Decimal
+    pending_days: Decimal
+    # Approved days by month of the leave start, January first
+    monthly_days: List[Decimal]
+
+class UsageReport(BaseModel):
+    year: int
+    rows: List[UsageReportRow]
+
+class AbsenceCalendarDay(BaseModel):
+    day: date
+    department_id: Optional[int]
+    department: Optional[str]
+    absent: int
+
+class AbsenceCalendar(BaseModel):
+    date_from: date
+    date_to: date
+    days: List[AbsenceCalendarDay]
+
+class DepartmentAbsenceDay(BaseModel):
+    day: date
+    absent_count: int
+    pending_count: int
+
+class AbsenceSummaryRebuild(BaseModel):
+    rows: int
@@ -1,11 +1,24 @@
+# app/services/admin_service.py
+import csv
+import io
+import json
+from datetime import date
+from typing import IO, Iterator
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import and_, bindparam, case, exists, func, insert, literal, or_, select, true
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
+from app.http_cache import DEPARTMENTS, LEAVE_TYPES, reference_cache
 from app.models import all_models as m
+from app.schemas import leave_schemas as ls
 from app.schemas import user_schemas as us
-from app.services.auth_service import get_password_hash
+from app.services.auth_service import get_password_hash, get_password_hashes, invalidate_principal
 from decimal import Decimal
 
-def create_user(db: Session, user: us.UserCreate):
-    hashed_password = get_password_hash(user.password)
+def create_user(db: Session, user: us.UserCreate, password_hash: str | None = None):
+    # Async callers hash ahead of time so bcrypt never runs on the event loop.
+    hashed_password = password_hash or get_password_hash(user.password)
     db_user = m.User(
         email=user.email,
         first_name=user.first_name,
@@ -16,30 +29,273 @@ def create_user(db: Session, user: us.UserCreate):
         role=user.role
     )
     db.add(db_user)
+    db.flush()
+    _add_leave_balances(db, [db_user], db.query(m.LeaveType).all())
     db.commit()
-    db.refresh(db_user)
-    initialize_leave_balances_for_user(db, db_user)
+    invalidate_principal(db_user.email)
 
     return db_user
 
+def _pro_rated_quota(annual_quota: Decimal, join_date: date) -> Decimal:
+    # Pro-rate leave based on joining month
+    months_worked = 12 - join_date.month + 1
+    return (annual_quota / 12) * months_worked
+
+def _add_leave_balances(db: Session, users: list, leave_types: list[m.LeaveType]):
+    """Inserts the joining-year balances for `users` as one multi-row INSERT."""
+    rows = [
+        {
+            "user_id": user.user_id,
+            "leave_type_id": lt.leave_type_id,
+            "year": user.join_date.year,
+            "balance_days": _pro_rated_quota(lt.annual_quota, user.join_date),
+            "used_days": 0,
+        }
+        for user in users for lt in leave_types
+    ]
+    if rows:
+        db.execute(insert(m.LeaveBalance), rows)
+
 def initialize_leave_balances_for_user(db: Session, user: m.User):
     """
     Creates initial leave balance records for a new user based on their join date.
     """
-    current_year = user.join_date.year
-    leave_types = db.query(m.LeaveType).all()
-    for lt in leave_types:
-        # Pro-rate leave based on joining month
-        join_month = user.join_date.month
-        months_worked = 12 - join_month + 1
-        pro_rated_quota = (lt.annual_quota / 12) * months_worked
-        
-        balance = m.LeaveBalance(
-            user_id=user.user_id,
-            leave_type_id=lt.leave_type_id,
-            year=current_year,
-            balance_days=pro_rated_quota,
-            used_days=0
+    _add_leave_balances(db, [user], db.query(m.LeaveType).all())
+    db.commit()
+
+def _parse_import_rows(stream: IO[bytes], fmt: str) -> Iterator[tuple[int, dict | None, str | None]]:
+    """Yields (line number, raw row, parse error) from a CSV or JSONL upload."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, {k: v for k, v in row.items() if v not in ("", None)}, None
+        return
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, "Each line must be a JSON object."
+            continue
+        yield line_no, row, None
+
+def _import_chunk(session_factory, chunk: list[tuple[int, us.UserCreate]], leave_types: list[m.LeaveType]):
+    """
+    Hashes passwords for a chunk of validated rows in parallel, then inserts
+    the users and all their balances with multi-row INSERTs in one transaction.
+    Returns (rows created, [(line, email, error)]).
+    """
+    failures = []
+    with session_factory() as db:
+        emails = [user.email for _, user in chunk]
+        existing = set(db.scalars(select(m.User.email).where(m.User.email.in_(emails))))
+        pending = []
+        for line_no, user in chunk:
+            if user.email in existing:
+                failures.append((line_no, user.email, "A user with this email already exists."))
+            else:
+                pending.append((line_no, user))
+        if not pending:
+            return 0, failures
+
+        hashes = get_password_hashes([user.password for _, user in pending])
+        try:
+            created = db.execute(
+                insert(m.User).returning(m.User.user_id, m.User.join_date, sort_by_parameter_order=True),
+                [
+                    {
+                        "email": user.email,
+                        "first_name": user.first_name,
+                        "last_name": user.last_name,
+                        "password_hash": password_hash,
+                        "department_id": user.department_id,
+                        "join_date": user.join_date,
+                        "role": user.role,
+                    }
+                    for (_, user), password_hash in zip(pending, hashes)
+                ]
+            ).all()
+            _add_leave_balances(db, created, leave_types)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            detail = f"Chunk rolled back: {e.__class__.__name__}"
+            return 0, failures + [(line_no, user.email, detail) for line_no, user in pending]
+    return len(created), failures
+
+def import_users(session_factory, stream: IO[bytes], fmt: str, chunk_size: int) -> Iterator[str]:
+    """
+    Streams a bulk user import. Rows are read and validated incrementally and
+    written chunk by chunk, each chunk in its own short transaction, so a bad
+    row or chunk never aborts the whole file. Yields NDJSON lines: one
+    "error" record per rejected row, a "progress" record per chunk and a
+    final "summary".
+    """
+    with session_factory() as db:
+        leave_types = db.query(m.LeaveType).all()
+
+    totals = {"rows": 0, "created": 0, "failed": 0}
+    seen: set[str] = set()
+    chunk: list[tuple[int, us.UserCreate]] = []
+
+    def error(line_no, email, detail):
+        totals["failed"] += 1
+        return json.dumps({"type": "error", "line": line_no, "email": email, "detail": detail}) + "\n"
+
+    def flush():
+        created, failures = _import_chunk(session_factory, chunk, leave_types)
+        totals["created"] += created
+        lines = [error(*failure) for failure in failures]
+        lines.append(json.dumps({"type": "progress", **totals}) + "\n")
+        chunk.clear()
+        return lines
+
+    for line_no, row, parse_error in _parse_import_rows(stream, fmt):
+        totals["rows"] += 1
+        if parse_error:
+            yield error(line_no, None, parse_error)
+            continue
+        try:
+            user = us.UserCreate.model_validate(row)
+        except ValidationError as e:
+            yield error(line_no, row.get("email"), "; ".join(
+                f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+            ))
+            continue
+        if user.email in seen:
+            yield error(line_no, user.email, "Duplicate email in file.")
+            continue
+        seen.add(user.email)
+        chunk.append((line_no, user))
+        if len(chunk) >= chunk_size:
+            yield from flush()
+    if chunk:
+        yield from flush()
+    yield json.dumps({"type": "summary", **totals}) + "\n"
+
+def _rollover_statement(from_year: int):
+    """
+    INSERT ... SELECT of next year's balances for one user_id range: the full
+    quota for every user and leave type, plus last year's unused days where the
+    type carries forward. Rows that already exist are skipped, so re-running a
+    range is a no-op.
+    """
+    to_year = from_year + 1
+    users, types = m.User.__table__, m.LeaveType.__table__
+    prev = m.LeaveBalance.__table__.alias("prev")
+    existing = m.LeaveBalance.__table__.alias("existing")
+    remaining = prev.c.balance_days - func.coalesce(prev.c.used_days, 0)
+    carried = case(
+        (and_(types.c.carry_forward.is_(True), remaining > 0), remaining),
+        else_=0
+    )
+    rows = select(
+        users.c.user_id,
+        types.c.leave_type_id,
+        literal(to_year),
+        types.c.annual_quota + carried,
+        literal(0)
+    ).select_from(
+        users.join(types, true()).outerjoin(prev, and_(
+            prev.c.user_id == users.c.user_id,
+            prev.c.leave_type_id == types.c.leave_type_id,
+            prev.c.year == from_year
+        ))
+    ).where(
+        users.c.user_id > bindparam("low_id"),
+        users.c.user_id <= bindparam("high_id"),
+        # Users joining later get their balances when they are created
+        or_(users.c.join_date.is_(None), users.c.join_date <= date(to_year, 12, 31)),
+        ~exists().where(
+            existing.c.user_id == users.c.user_id,
+            existing.c.leave_type_id == types.c.leave_type_id,
+            existing.c.year == to_year
         )
-        db.add(balance)
-    db.commit()
\ No newline at end of file
+    )
+    return insert(m.LeaveBalance.__table__).from_select(
+        ["user_id", "leave_type_id", "year", "balance_days", "used_days"], rows
+    )
+
+def rollover_leave_balances(session_factory, from_year: int, chunk_size: int, after_user_id: int = 0) -> Iterator[str]:
+    """
+    Creates the balances for `from_year + 1` in user_id order, one short
+    transaction per chunk of users, so it can run while the app is serving
+    traffic. Yields an NDJSON "progress" record per chunk with the last
+    user_id done; pass it back as `after_user_id` to resume an interrupted run.
+    """
+    statement = _rollover_statement(from_year)
+    totals = {"from_year": from_year, "to_year": from_year + 1, "users": 0, "inserted": 0, "last_user_id": after_user_id}
+    while True:
+        with session_factory() as db:
+            user_ids = db.scalars(
+                select(m.User.user_id).where(m.User.user_id > totals["last_user_id"])
+                .order_by(m.User.user_id).limit(chunk_size)
+            ).all()
+            if not user_ids:
+                break
+            params = {"low_id": totals["last_user_id"], "high_id": user_ids[-1]}
+            try:
+                inserted = db.execute(statement, params).rowcount
+                db.commit()
+            except IntegrityError:
+                # A user created concurrently got the same rows first; the
+                # NOT EXISTS guard makes the retry skip them.
+                db.rollback()
+                inserted = db.execute(statement, params).rowcount
+                db.commit()
+        totals["users"] += len(user_ids)
+        totals["inserted"] += inserted
+        totals["last_user_id"] = user_ids[-1]
+        yield json.dumps({"type": "progress", **totals}) + "\n"
+    yield json.dumps({"type": "summary", **totals}) + "\n"
+
+def create_leave_type(db: Session, leave_type: ls.LeaveTypeCreate):
+    db_leave_type = m.LeaveType(**leave_type.model_dump())
+    db.add(db_leave_type)
+    db.commit()
+    db.refresh(db_leave_type)
+    reference_cache.invalidate(LEAVE_TYPES)
+    return db_leave_type
+
+def list_departments(db: Session):
+    return db.query(m.Department).all()
+
+def create_department(db: Session, department: ls.DepartmentCreate):
+    db_department = m.Department(**department.model_dump())
+    db.add(db_department)
+    db.commit()
+    db.refresh(db_department)
+    reference_cache.invalidate(DEPARTMENTS)
+    return db_department
+
+def list_holidays(db: Session, year: int | None = None):
+    query = db.query(m.Holiday)
+    if year:
+        query = query.filter(m.Holiday.holiday_date.between(date(year, 1, 1), date(year, 12, 31)))
+    return query.order_by(m.Holiday.holiday_date).all()
+
+def create_holiday(db: Session, holiday: ls.HolidayCreate):
+    # NULL never equals NULL in the unique constraint, so compare countries here
+    same_country = (
+        m.Holiday.country_code.is_(None) if holiday.country_code is None
+        else m.Holiday.country_code == holiday.country_code
+    )
+    if db.query(m.Holiday).filter(m.Holiday.holiday_date == holiday.holiday_date, same_country).first():
+        raise HTTPException(status_code=400, detail="A holiday already exists on this date for this country.")
+    db_holiday = m.Holiday(**holiday.model_dump())
+    db.add(db_holiday)
+    db.commit()
+    db.refresh(db_holiday)
+    return db_holiday
+
+def delete_holiday(db: Session, holiday_id: int):
+    db_holiday = db.get(m.Holiday, holiday_id)
+    if not db_holiday:
+        raise HTTPException(status_code=404, detail="Holiday not found.")
+    db.delete(db_holiday)
+    db.commit()
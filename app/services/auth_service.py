@@ -1,17 +1,108 @@
 # app/services/auth_service.py
+import asyncio
+import functools
+import hashlib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-from jose import JWTError, jwt
+from fastapi import HTTPException, status
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
 from passlib.context import CryptContext
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.cache import TTLCache
 from app.config import settings
+from app.models import all_models as m
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+class BoundedExecutor:
+    """
+    Thread pool with a cap on queued work. Once max_workers + max_queue tasks
+    are in flight, non-blocking submissions are rejected with a 503 instead
+    of piling up behind each other.
+    """
+    def __init__(self, max_workers: int, max_queue: int, thread_name_prefix: str = ""):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+
+    def submit(self, fn, *args, block: bool = False) -> Future:
+        if not self._slots.acquire(blocking=block):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent authentication attempts. Please retry shortly.",
+                headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+            )
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+# bcrypt is deliberately slow, so it gets its own pool instead of competing
+# with every sync route for the shared request threadpool.
+password_executor = BoundedExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE_SIZE,
+    thread_name_prefix="password-hash"
+)
+
+# Verified principals keyed by token subject (the user's email), so that
+# get_current_user can skip the users lookup on hot tokens.
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+_USER_COLUMNS = [attr.key for attr in inspect(m.User).column_attrs]
+
+# Verified claims keyed by the SHA-256 of the bearer token, so a token that is
+# presented again skips signature verification. Entries never outlive `exp`.
+token_claims_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL_SECONDS
+)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_executor.submit(pwd_context.verify, plain_password, hashed_password).result()
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.wrap_future(
+        password_executor.submit(pwd_context.verify, plain_password, hashed_password)
+    )
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_executor.submit(pwd_context.hash, password).result()
+
+def get_password_hashes(passwords: list[str]) -> list[str]:
+    """
+    Hashes many passwords in parallel for bulk jobs. Works in waves no larger
+    than the pool, waiting for free slots rather than failing, so logins can
+    still queue alongside an import.
+    """
+    hashes, wave = [], settings.PASSWORD_HASH_WORKERS
+    for start in range(0, len(passwords), wave):
+        futures = [
+            password_executor.submit(pwd_context.hash, password, block=True)
+            for password in passwords[start:start + wave]
+        ]
+        hashes.extend(future.result() for future in futures)
+    return hashes
+
+async def get_password_hash_async(password: str) -> str:
+    return await asyncio.wrap_future(password_executor.submit(pwd_context.hash, password))
+
+def get_user_by_email(db: Session, email: str) -> Optional[m.User]:
+    return db.query(m.User).filter(m.User.email == email).first()
+
+@functools.lru_cache(maxsize=4)
+def _signing_key(secret: str, algorithm: str) -> Key:
+    # python-jose builds a key object from the secret on every call unless handed one
+    return jwk.construct(secret, algorithm)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -20,5 +111,67 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=15)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
-    return encoded_jwt
\ No newline at end of file
+    key = _signing_key(settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, key, algorithm=settings.JWT_ALGORITHM)
+    return encoded_jwt
+
+def decode_access_token(token: str) -> dict:
+    """
+    Returns the verified claims of a bearer token, from the claims cache when
+    the same token was verified recently. Raises JWTError if the token is
+    invalid or expired. The returned dict is shared; do not modify it.
+    """
+    cache_key = hashlib.sha256(token.encode()).digest()
+    claims = token_claims_cache.get(cache_key)
+    if claims is not None:
+        return claims
+    key = _signing_key(settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM)
+    claims = jwt.decode(token, key, algorithms=[settings.JWT_ALGORITHM])
+    ttl = settings.TOKEN_CACHE_TTL_SECONDS
+    if "exp" in claims:
+        ttl = min(ttl, claims["exp"] - time.time())
+    if ttl > 0:
+        token_claims_cache.set(cache_key, claims, ttl=ttl)
+    return claims
+
+def principal_generation() -> int:
+    """Read before loading a user, and pass to cache_principal afterwards."""
+    return principal_cache.generation
+
+def cache_principal(user: m.User, generation: Optional[int] = None) -> None:
+    """Caches the user unless a principal was invalidated since `generation` was read."""
+    principal_cache.set(user.email, {key: getattr(user, key) for key in _USER_COLUMNS}, generation=generation)
+
+def get_cached_principal(email: str) -> Optional[m.User]:
+    """
+    Rebuilds a detached User from the cached column snapshot.
+    Relationships are not loaded on the returned instance.
+    """
+    snapshot = principal_cache.get(email)
+    if snapshot is None:
+        return None
+    user = m.User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+def invalidate_principal(email: str) -> None:
+    principal_cache.invalidate(email)
+
+@event.listens_for(m.User, "after_update")
+@event.listens_for(m.User, "after_delete")
+def _invalidate_principal_on_change(mapper, connection, target):
+    # Drop the old address too if the email itself was changed. Nothing is
+    # dropped until the change commits: before that, another request would
+    # read the old row and could cache it again.
+    emails = {target.email, *inspect(target).attrs.email.history.deleted}
+    changed = inspect(target).session.info.setdefault("changed_principals", set())
+    changed.update(email for email in emails if email)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_principals(session):
+    for email in session.info.pop("changed_principals", ()):
+        invalidate_principal(email)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_principals(session):
+    session.info.pop("changed_principals", None)
@@ -0,0 +1,80 @@
+# app/services/calendar_service.py
+from array import array
+from datetime import date, timedelta
+from sqlalchemy import event, or_, select
+from sqlalchemy.orm import Session
+from app.cache import TTLCache
+from app.config import settings
+from app.models import all_models as m
+
+class YearCalendar:
+    """
+    Working-day bitmap for one country and year, with prefix sums so the
+    number of working days in any range of the year is a single subtraction.
+    """
+    def __init__(self, year: int, holidays: set[date], weekend_days: set[int]):
+        self.year = year
+        self.first_day = date(year, 1, 1)
+        length = (date(year + 1, 1, 1) - self.first_day).days
+        self.bitmap = bytearray(length)
+        # prefix[i] = working days strictly before day-of-year i
+        self.prefix = array("I", [0]) * (length + 1)
+        day = self.first_day
+        for i in range(length):
+            self.bitmap[i] = day.weekday() not in weekend_days and day not in holidays
+            self.prefix[i + 1] = self.prefix[i] + self.bitmap[i]
+            day += timedelta(days=1)
+
+    def is_working_day(self, day: date) -> bool:
+        return bool(self.bitmap[(day - self.first_day).days])
+
+    def working_days(self, start: date, end: date) -> int:
+        """Working days in [start, end]; both dates must fall in this year."""
+        return self.prefix[(end - self.first_day).days + 1] - self.prefix[(start - self.first_day).days]
+
+calendar_cache = TTLCache(
+    maxsize=settings.CALENDAR_CACHE_MAX_SIZE,
+    ttl=settings.CALENDAR_CACHE_TTL_SECONDS
+)
+
+def _load_year(db: Session, country_code: str | None, year: int) -> YearCalendar:
+    query = select(m.Holiday.holiday_date).where(
+        m.Holiday.holiday_date.between(date(year, 1, 1), date(year, 12, 31))
+    )
+    # Holidays without a country apply everywhere; with no country, only those count
+    if country_code:
+        query = query.where(or_(m.Holiday.country_code.is_(None), m.Holiday.country_code == country_code))
+    else:
+        query = query.where(m.Holiday.country_code.is_(None))
+    return YearCalendar(year, set(db.scalars(query)), set(settings.WEEKEND_DAYS))
+
+def get_year_calendar(db: Session, year: int, country_code: str | None = None) -> YearCalendar:
+    country_code = country_code or settings.HOLIDAY_COUNTRY_CODE
+    key = (country_code, year)
+    calendar = calendar_cache.get(key)
+    if calendar is None:
+        calendar = _load_year(db, country_code, year)
+        calendar_cache.set(key, calendar)
+    return calendar
+
+def count_working_days(db: Session, start: date, end: date, country_code: str | None = None) -> int:
+    """Working days in [start, end], excluding weekends and holidays; O(1) per calendar year spanned."""
+    total = 0
+    for year in range(start.year, end.year + 1):
+        calendar = get_year_calendar(db, year, country_code)
+        total += calendar.working_days(max(start, date(year, 1, 1)), min(end, date(year, 12, 31)))
+    return total
+
+def is_working_day(db: Session, day: date, country_code: str | None = None) -> bool:
+    return get_year_calendar(db, day.year, country_code).is_working_day(day)
+
+def invalidate_calendars() -> None:
+    calendar_cache.clear()
+
+@event.listens_for(m.Holiday, "after_insert")
+@event.listens_for(m.Holiday, "after_update")
+@event.listens_for(m.Holiday, "after_delete")
+def _invalidate_calendars_on_change(mapper, connection, target):
+    # Holidays change a few times a year and a NULL-country holiday touches
+    # every country's calendar, so simply rebuild everything on next use.
+    invalidate_calendars()
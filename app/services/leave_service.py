@@ -1,93 +1,437 @@
 # app/services/leave_service.py
+import base64
+import binascii
+import csv
+import io
+import json
+from typing import Iterator
+from sqlalchemy import Select, and_, bindparam, case, func, insert, literal, select, tuple_, update
 from sqlalchemy.orm import Session, joinedload
-from datetime import date, timedelta
+from sqlalchemy.orm.attributes import set_committed_value
+from datetime import date, datetime, timedelta
+from app.config import settings
 from app.models import all_models as m
 from app.schemas import leave_schemas as ls
+from app.services import calendar_service, report_service
 from fastapi import HTTPException, status
 from decimal import Decimal
 
+def get_leave_types(db: Session):
+    return db.query(m.LeaveType).all()
+
 def get_leave_balances(db: Session, user_id: int, year: int):
     return db.query(m.LeaveBalance).options(joinedload(m.LeaveBalance.leave_type)).filter(
         m.LeaveBalance.user_id == user_id,
         m.LeaveBalance.year == year
     ).all()
 
+def encode_cursor(applied_at: datetime, request_id: int) -> str:
+    raw = json.dumps([applied_at.isoformat(sep=" "), request_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        applied_at, request_id = json.loads(raw)
+        return datetime.fromisoformat(applied_at), int(request_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+
+def _paginate_leave_requests(db: Session, query: Select, page: int, limit: int, cursor: str | None):
+    """
+    Newest-first keyset pagination over (applied_at, request_id). With a cursor
+    the next page is an index range scan however deep it is; without one we
+    fall back to OFFSET so `page` keeps working for existing clients.
+    Returns the rows and the cursor for the following page, if any.
+    """
+    query = query.order_by(m.LeaveRequest.applied_at.desc(), m.LeaveRequest.request_id.desc())
+    if cursor:
+        applied_at, request_id = decode_cursor(cursor)
+        if db.get_bind().dialect.name == "sqlite":
+            # SQLite keeps timestamps as text; compare against the stored format
+            applied_at = literal(applied_at.isoformat(sep=" "))
+        query = query.where(
+            tuple_(m.LeaveRequest.applied_at, m.LeaveRequest.request_id) < tuple_(applied_at, request_id)
+        )
+    else:
+        query = query.offset((page - 1) * limit)
+
+    rows = db.execute(query.limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].applied_at, rows[-1].request_id)
+    return rows, next_cursor
+
+# Columns behind LeaveRequestResponse / AdminLeaveRequestResponse. The list
+# endpoints select just these and build the response dicts directly instead of
+# loading ORM objects and validating them through the schemas.
+_LEAVE_REQUEST_COLUMNS = (
+    m.LeaveRequest.request_id, m.LeaveRequest.user_id, m.LeaveRequest.start_date, m.LeaveRequest.end_date,
+    m.LeaveRequest.total_days, m.LeaveRequest.is_half_day, m.LeaveRequest.status, m.LeaveRequest.reason,
+    m.LeaveRequest.applied_at, m.LeaveRequest.leave_type_id,
+    m.LeaveType.name.label("leave_type_name"), m.LeaveType.paid, m.LeaveType.annual_quota, m.LeaveType.carry_forward,
+)
+
+def _leave_type_dicts(rows) -> dict[int, dict]:
+    # One dict per leave type, shared by every request of that type on the page
+    return {
+        row.leave_type_id: {
+            "name": row.leave_type_name,
+            "paid": row.paid,
+            "annual_quota": row.annual_quota,
+            "carry_forward": row.carry_forward,
+            "leave_type_id": row.leave_type_id,
+        }
+        for row in rows
+    }
+
+def get_user_leave_requests(db: Session, user_id: int, page: int, limit: int, cursor: str | None = None):
+    """A page of the user's requests as plain dicts shaped like LeaveRequestResponse."""
+    query = select(*_LEAVE_REQUEST_COLUMNS).join(
+        m.LeaveType, m.LeaveType.leave_type_id == m.LeaveRequest.leave_type_id
+    ).where(m.LeaveRequest.user_id == user_id)
+    rows, next_cursor = _paginate_leave_requests(db, query, page, limit, cursor)
+    leave_types = _leave_type_dicts(rows)
+    return [
+        {
+            "request_id": row.request_id,
+            "user_id": row.user_id,
+            "leave_type": leave_types[row.leave_type_id],
+            "start_date": row.start_date,
+            "end_date": row.end_date,
+            "total_days": row.total_days,
+            "is_half_day": row.is_half_day,
+            "status": row.status,
+            "reason": row.reason,
+        }
+        for row in rows
+    ], next_cursor
+
+def list_leave_requests(db: Session, status: str | None, page: int, limit: int, cursor: str | None = None):
+    """A page of everyone's requests as plain dicts shaped like AdminLeaveRequestResponse."""
+    query = select(*_LEAVE_REQUEST_COLUMNS, m.User.first_name, m.User.last_name).join(
+        m.LeaveType, m.LeaveType.leave_type_id == m.LeaveRequest.leave_type_id
+    ).join(m.User, m.User.user_id == m.LeaveRequest.user_id)
+    if status:
+        query = query.where(m.LeaveRequest.status == status)
+    rows, next_cursor = _paginate_leave_requests(db, query, page, limit, cursor)
+    leave_types = _leave_type_dicts(rows)
+    return [
+        {
+            "request_id": row.request_id,
+            "user": {"user_id": row.user_id, "first_name": row.first_name, "last_name": row.last_name},
+            "leave_type": leave_types[row.leave_type_id],
+            "start_date": row.start_date,
+            "end_date": row.end_date,
+            "total_days": row.total_days,
+            "status": row.status,
+            "reason": row.reason,
+        }
+        for row in rows
+    ], next_cursor
+
+EXPORT_COLUMNS = [
+    "request_id", "user_id", "email", "first_name", "last_name", "department_id",
+    "leave_type", "paid", "start_date", "end_date", "total_days", "is_half_day",
+    "status", "reason", "applied_at", "approved_by", "approval_note",
+]
+
+def _export_statement(date_from: date | None, date_to: date | None, status: str | None):
+    lr = m.LeaveRequest
+    query = select(
+        lr.request_id, lr.user_id, m.User.email, m.User.first_name, m.User.last_name,
+        m.User.department_id, m.LeaveType.name.label("leave_type"), m.LeaveType.paid,
+        lr.start_date, lr.end_date, lr.total_days, lr.is_half_day,
+        lr.status, lr.reason, lr.applied_at, lr.approved_by, lr.approval_note
+    ).join(m.User, m.User.user_id == lr.user_id).join(
+        m.LeaveType, m.LeaveType.leave_type_id == lr.leave_type_id
+    ).order_by(lr.request_id)
+    # Requests overlapping the period, so leave spanning a month end is in both months
+    if date_from:
+        query = query.where(lr.end_date >= date_from)
+    if date_to:
+        query = query.where(lr.start_date <= date_to)
+    if status:
+        query = query.where(lr.status == status)
+    return query
+
+def export_leave_requests(session_factory, fmt: str, date_from: date | None, date_to: date | None,
+                          status: str | None, batch_size: int) -> Iterator[str]:
+    """
+    Streams leave requests joined with their user and leave type as CSV or
+    NDJSON. Rows come through a server-side cursor `batch_size` at a time and
+    are emitted per batch, so memory stays flat however large the export.
+    """
+    statement = _export_statement(date_from, date_to, status).execution_options(yield_per=batch_size)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer:
+        writer.writerow(EXPORT_COLUMNS)
+    with session_factory() as db:
+        for partition in db.execute(statement).partitions():
+            for row in partition:
+                if writer:
+                    writer.writerow(row)
+                else:
+                    buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=str) + "\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
 def apply_for_leave(db: Session, user: m.User, request: ls.LeaveRequestCreate):
+    """
+    Validates and files a leave request in one transaction. The user's balance
+    rows for the year are locked first, so on PostgreSQL concurrent
+    submissions by the same user queue behind each other instead of both
+    passing the checks. SQLite ignores FOR UPDATE and runs the checks before
+    taking its write lock, so there two racing submissions can both be filed.
+    """
     # 1. Basic Validations
     if request.start_date > request.end_date:
         raise HTTPException(status_code=400, detail="Start date cannot be after end date.")
     if request.start_date < user.join_date:
         raise HTTPException(status_code=400, detail="Cannot apply for leave before joining date.")
+    # Counting costs a holiday lookup per calendar year spanned, so bound the range first
+    if (request.end_date - request.start_date).days >= settings.MAX_LEAVE_REQUEST_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Leave requests cannot span more than {settings.MAX_LEAVE_REQUEST_DAYS} days."
+        )
 
-    # 2. Check for overlapping requests
-    overlapping = db.query(m.LeaveRequest).filter(
-        m.LeaveRequest.user_id == user.user_id,
-        m.LeaveRequest.status.in_(['Pending', 'Approved']),
-        m.LeaveRequest.start_date <= request.end_date,
-        m.LeaveRequest.end_date >= request.start_date
-    ).first()
-    if overlapping:
-        raise HTTPException(status_code=400, detail="Overlapping leave request already exists.")
-
-    # 3. Calculate total leave days
-    # This is a simple calculation; a real one would exclude weekends/holidays
-    # For simplicity in this MVP, we use date difference.
+    # 2. Calculate total leave days, excluding weekends and holidays
     if request.is_half_day:
-        total_days = Decimal("0.5")
         if request.start_date != request.end_date:
             raise HTTPException(status_code=400, detail="Half-day leave must be for a single day.")
+        total_days = Decimal("0.5") * calendar_service.count_working_days(db, request.start_date, request.end_date, user.country_code)
     else:
-        total_days = (request.end_date - request.start_date).days + 1
+        total_days = Decimal(calendar_service.count_working_days(db, request.start_date, request.end_date, user.country_code))
+    if not total_days:
+        raise HTTPException(status_code=400, detail="The selected dates contain no working days.")
 
-    # 4. Check sufficient balance
-    balance = db.query(m.LeaveBalance).filter(
+    # 3. Lock the user's balances for the year (SELECT ... FOR UPDATE; a no-op on SQLite)
+    year = request.start_date.year
+    balances = db.query(m.LeaveBalance).options(joinedload(m.LeaveBalance.leave_type)).filter(
         m.LeaveBalance.user_id == user.user_id,
-        m.LeaveBalance.leave_type_id == request.leave_type_id,
-        m.LeaveBalance.year == request.start_date.year
-    ).first()
+        m.LeaveBalance.year == year
+    ).order_by(m.LeaveBalance.leave_type_id).with_for_update(of=m.LeaveBalance).all()
+    balance = next((b for b in balances if b.leave_type_id == request.leave_type_id), None)
+    if not balance:
+        raise HTTPException(status_code=400, detail="Insufficient leave balance.")
+
+    # 4. Overlap check and days already pending against this balance, in one query
+    overlaps = and_(
+        m.LeaveRequest.start_date <= request.end_date,
+        m.LeaveRequest.end_date >= request.start_date
+    )
+    pending_for_balance = and_(
+        m.LeaveRequest.status == 'Pending',
+        m.LeaveRequest.leave_type_id == request.leave_type_id,
+        m.LeaveRequest.start_date.between(date(year, 1, 1), date(year, 12, 31))
+    )
+    overlapping, pending_days = db.query(
+        func.count(case((overlaps, 1))),
+        func.coalesce(func.sum(case((pending_for_balance, m.LeaveRequest.total_days), else_=0)), 0)
+    ).filter(
+        m.LeaveRequest.user_id == user.user_id,
+        m.LeaveRequest.status.in_(['Pending', 'Approved'])
+    ).one()
+    if overlapping:
+        raise HTTPException(status_code=400, detail="Overlapping leave request already exists.")
 
-    if not balance or (balance.balance_days - balance.used_days) < total_days:
+    # 5. Check sufficient balance, counting requests still awaiting approval
+    if balance.balance_days - balance.used_days - Decimal(pending_days) < total_days:
         raise HTTPException(status_code=400, detail="Insufficient leave balance.")
 
-    # 5. Create Leave Request
-    db_request = m.LeaveRequest(
-        user_id=user.user_id,
-        leave_type_id=request.leave_type_id,
-        start_date=request.start_date,
-        end_date=request.end_date,
-        is_half_day=request.is_half_day,
-        total_days=total_days,
-        reason=request.reason,
-        status='Pending'
+    # 6. Create Leave Request, reading the stored row back with RETURNING
+    db_request = db.scalars(
+        insert(m.LeaveRequest).values(
+            user_id=user.user_id,
+            leave_type_id=request.leave_type_id,
+            start_date=request.start_date,
+            end_date=request.end_date,
+            is_half_day=request.is_half_day,
+            total_days=total_days,
+            reason=request.reason,
+            status='Pending'
+        ).returning(m.LeaveRequest)
+    ).one()
+    set_committed_value(db_request, "leave_type", balance.leave_type)
+    report_service.adjust_department_absence(
+        db, [(user.department_id, request.start_date, request.end_date, 0, 1)]
     )
-    db.add(db_request)
     db.commit()
-    db.refresh(db_request)
     return db_request
 
 def process_leave_request(db: Session, request_id: int, approval_data: ls.LeaveApproval, approver: m.User):
-    db_request = db.query(m.LeaveRequest).filter(m.LeaveRequest.request_id == request_id).first()
+    """
+    Decides a pending request. Both writes are single guarded UPDATEs checked
+    by the database: the status only changes while the request is still
+    Pending, and an approval only deducts if the balance still covers it.
+    Concurrent approvals therefore cannot double-process a request or
+    overdraw a balance.
+    """
+    db_request = db.scalars(
+        update(m.LeaveRequest).where(
+            m.LeaveRequest.request_id == request_id,
+            m.LeaveRequest.status == 'Pending'
+        ).values(
+            status=approval_data.status,
+            approved_by=approver.user_id,
+            approval_note=approval_data.approval_note
+        ).returning(m.LeaveRequest),
+        execution_options={"populate_existing": True}
+    ).one_or_none()
     if not db_request:
-        raise HTTPException(status_code=404, detail="Leave request not found.")
-    if db_request.status != 'Pending':
+        exists = db.scalar(select(m.LeaveRequest.request_id).where(m.LeaveRequest.request_id == request_id))
+        db.rollback()
+        if not exists:
+            raise HTTPException(status_code=404, detail="Leave request not found.")
         raise HTTPException(status_code=400, detail="Leave request has already been processed.")
 
-    db_request.status = approval_data.status
-    db_request.approved_by = approver.user_id
-    db_request.approval_note = approval_data.approval_note
-    
-    # If approved, deduct from balance
+    # If approved, deduct from balance in the database
     if approval_data.status == 'Approved':
-        balance = db.query(m.LeaveBalance).filter(
+        balance_filter = and_(
             m.LeaveBalance.user_id == db_request.user_id,
             m.LeaveBalance.leave_type_id == db_request.leave_type_id,
             m.LeaveBalance.year == db_request.start_date.year
+        )
+        deducted = db.execute(
+            update(m.LeaveBalance).where(
+                balance_filter,
+                m.LeaveBalance.balance_days - m.LeaveBalance.used_days >= db_request.total_days
+            ).values(
+                used_days=m.LeaveBalance.used_days + db_request.total_days
+            ).returning(m.LeaveBalance.balance_id),
+            execution_options={"synchronize_session": False}
         ).first()
-        if not balance:
-            raise HTTPException(status_code=400, detail="Leave balance record not found for user.")
-        
-        balance.used_days += db_request.total_days
+        if not deducted:
+            has_balance = db.scalar(select(m.LeaveBalance.balance_id).where(balance_filter))
+            db.rollback()
+            if not has_balance:
+                raise HTTPException(status_code=400, detail="Leave balance record not found for user.")
+            raise HTTPException(status_code=400, detail="Insufficient leave balance.")
 
+    # The request stops counting as pending, and counts as absence if approved
+    department_id = db.scalar(select(m.User.department_id).where(m.User.user_id == db_request.user_id))
+    report_service.adjust_department_absence(db, [(
+        department_id, db_request.start_date, db_request.end_date,
+        1 if approval_data.status == 'Approved' else 0, -1
+    )])
+    # Responses embed the leave type; in async mode nothing can be
+    # lazy-loaded once the service call has returned.
+    set_committed_value(db_request, "leave_type", db.get(m.LeaveType, db_request.leave_type_id))
     db.commit()
-    db.refresh(db_request)
-    return db_request
\ No newline at end of file
+    return db_request
+
+def process_leave_requests_batch(db: Session, decisions: list[ls.LeaveDecision], approver: m.User):
+    """
+    Approves or rejects many requests in one transaction. Requests and the
+    affected balances are locked up front, then each decision is written with
+    the same guarded UPDATEs as process_leave_request, in submission order:
+    the status only changes while the request is still Pending, and an
+    approval only deducts if the balance still covers it. Items that cannot
+    be processed are reported individually and do not fail the rest of the
+    batch.
+    """
+    results: list[ls.BatchLeaveResult | None] = [None] * len(decisions)
+    ids = [decision.request_id for decision in decisions]
+    requests = {
+        r.request_id: r for r in db.query(m.LeaveRequest).filter(
+            m.LeaveRequest.request_id.in_(ids)
+        ).order_by(m.LeaveRequest.request_id).with_for_update()
+    }
+
+    def fail(index, detail):
+        results[index] = ls.BatchLeaveResult(request_id=decisions[index].request_id, ok=False, detail=detail)
+
+    accepted, seen = [], set()
+    for index, decision in enumerate(decisions):
+        db_request = requests.get(decision.request_id)
+        if decision.request_id in seen:
+            fail(index, "Duplicate request id in batch.")
+        elif not db_request:
+            fail(index, "Leave request not found.")
+        elif db_request.status != 'Pending':
+            fail(index, "Leave request has already been processed.")
+        elif decision.status not in ('Approved', 'Rejected'):
+            fail(index, "Status must be 'Approved' or 'Rejected'.")
+        else:
+            accepted.append((index, decision, db_request))
+        seen.add(decision.request_id)
+
+    # Lock every balance an approval would draw from
+    keys = {
+        (r.user_id, r.leave_type_id, r.start_date.year)
+        for _, d, r in accepted if d.status == 'Approved'
+    }
+    balances = {}
+    if keys:
+        balances = {
+            (b.user_id, b.leave_type_id, b.year): b for b in db.query(m.LeaveBalance).filter(
+                tuple_(m.LeaveBalance.user_id, m.LeaveBalance.leave_type_id, m.LeaveBalance.year).in_(keys)
+            ).order_by(m.LeaveBalance.balance_id).with_for_update()
+        }
+
+    # The locks above are skipped where FOR UPDATE is not supported (SQLite),
+    # so every write re-checks its precondition and reports whether it matched.
+    balances_table = m.LeaveBalance.__table__
+    requests_table = m.LeaveRequest.__table__
+    deduct = update(balances_table).where(
+        balances_table.c.balance_id == bindparam("target_id"),
+        balances_table.c.balance_days - balances_table.c.used_days >= bindparam("days")
+    ).values(used_days=balances_table.c.used_days + bindparam("days")).returning(balances_table.c.balance_id)
+    refund = update(balances_table).where(
+        balances_table.c.balance_id == bindparam("target_id")
+    ).values(used_days=balances_table.c.used_days - bindparam("days"))
+    decide = update(requests_table).where(
+        requests_table.c.request_id == bindparam("target_id"),
+        requests_table.c.status == 'Pending'
+    ).values(
+        status=bindparam("new_status"), approval_note=bindparam("note"), approved_by=approver.user_id
+    ).returning(requests_table.c.request_id)
+
+    decided = []
+    for index, decision, db_request in accepted:
+        deduction = None
+        if decision.status == 'Approved':
+            balance = balances.get((db_request.user_id, db_request.leave_type_id, db_request.start_date.year))
+            if not balance:
+                fail(index, "Leave balance record not found for user.")
+                continue
+            deduction = {"target_id": balance.balance_id, "days": db_request.total_days}
+            if not db.execute(deduct, deduction).first():
+                fail(index, "Insufficient leave balance.")
+                continue
+        if not db.execute(decide, {
+            "target_id": db_request.request_id,
+            "new_status": decision.status,
+            "note": decision.approval_note,
+        }).first():
+            # Decided by someone else since it was loaded; give the days back
+            if deduction:
+                db.execute(refund, deduction)
+            fail(index, "Leave request has already been processed.")
+            continue
+        decided.append((db_request.user_id, db_request.start_date, db_request.end_date, decision.status))
+        results[index] = ls.BatchLeaveResult(request_id=decision.request_id, ok=True, status=decision.status)
+
+    # Core UPDATEs bypass the identity map; reload anything touched on next access
+    for instance in [*requests.values(), *balances.values()]:
+        db.expire(instance)
+    if decided:
+        departments = dict(db.execute(
+            select(m.User.user_id, m.User.department_id).where(
+                m.User.user_id.in_({user_id for user_id, *_ in decided})
+            )
+        ).all())
+        report_service.adjust_department_absence(db, [
+            (departments.get(user_id), start, end, 1 if new_status == 'Approved' else 0, -1)
+            for user_id, start, end, new_status in decided
+        ])
+    db.commit()
+
+    processed = len(decided)
+    return ls.BatchLeaveApprovalResponse(processed=processed, failed=len(results) - processed, results=results)
@@ -0,0 +1,239 @@
+# app/services/report_service.py
+from datetime import date, timedelta
+from decimal import Decimal
+from sqlalchemy import Date, case, delete, extract, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.cache import TTLCache
+from app.config import settings
+from app.models import all_models as m
+
+# Finished reports keyed by report name and query parameters
+report_cache = TTLCache(maxsize=256, ttl=settings.REPORT_CACHE_TTL_SECONDS)
+
+MAX_CALENDAR_DAYS = 366
+ZERO = Decimal("0.00")
+# Rows per multi-row upsert into the absence summary
+ABSENCE_UPSERT_CHUNK = 500
+
+def usage_report(db: Session, year: int, department_id: int | None = None) -> dict:
+    """
+    Entitlement and usage per department and leave type for one year, with
+    approved days broken down by month. Two GROUP BY queries do the work: one
+    over balances and one over the year's requests.
+    """
+    lb, lr, users = m.LeaveBalance, m.LeaveRequest, m.User
+
+    balances = select(
+        users.department_id,
+        lb.leave_type_id,
+        func.count(func.distinct(lb.user_id)),
+        func.coalesce(func.sum(lb.balance_days), 0),
+        func.coalesce(func.sum(lb.used_days), 0)
+    ).join(users, users.user_id == lb.user_id).where(
+        lb.year == year
+    ).group_by(users.department_id, lb.leave_type_id)
+
+    month = extract("month", lr.start_date)
+    requests = select(
+        users.department_id,
+        lr.leave_type_id,
+        month,
+        func.coalesce(func.sum(case((lr.status == "Approved", lr.total_days), else_=0)), 0),
+        func.coalesce(func.sum(case((lr.status == "Pending", lr.total_days), else_=0)), 0)
+    ).join(users, users.user_id == lr.user_id).where(
+        lr.start_date.between(date(year, 1, 1), date(year, 12, 31)),
+        lr.status.in_(["Approved", "Pending"])
+    ).group_by(users.department_id, lr.leave_type_id, month)
+
+    if department_id is not None:
+        balances = balances.where(users.department_id == department_id)
+        requests = requests.where(users.department_id == department_id)
+
+    departments = dict(db.execute(select(m.Department.department_id, m.Department.name)).all())
+    leave_types = dict(db.execute(select(m.LeaveType.leave_type_id, m.LeaveType.name)).all())
+    rows: dict[tuple, dict] = {}
+
+    def row(dept_id, type_id):
+        key = (dept_id, type_id)
+        if key not in rows:
+            rows[key] = {
+                "department_id": dept_id,
+                "department": departments.get(dept_id),
+                "leave_type_id": type_id,
+                "leave_type": leave_types.get(type_id, ""),
+                "employees": 0,
+                "entitled_days": ZERO,
+                "used_days": ZERO,
+                "pending_days": ZERO,
+                "monthly_days": [ZERO] * 12,
+            }
+        return rows[key]
+
+    for dept_id, type_id, employees, entitled, used in db.execute(balances):
+        entry = row(dept_id, type_id)
+        entry.update(employees=employees, entitled_days=Decimal(entitled), used_days=Decimal(used))
+    for dept_id, type_id, month_no, approved, pending in db.execute(requests):
+        entry = row(dept_id, type_id)
+        entry["monthly_days"][int(month_no) - 1] += Decimal(approved)
+        entry["pending_days"] += Decimal(pending)
+
+    ordered = sorted(rows.values(), key=lambda r: (r["department"] or "", r["leave_type"]))
+    return {"year": year, "rows": ordered}
+
+def _next_day(day, dialect_name: str):
+    # SQLite stores dates as ISO text and has no date arithmetic operators
+    if dialect_name == "sqlite":
+        return func.date(day, "+1 day")
+    return day + 1
+
+def absence_calendar(db: Session, date_from: date, date_to: date, department_id: int | None = None) -> dict:
+    """
+    Number of people on approved leave for each day and department in
+    [date_from, date_to]. The days come from a recursive CTE and are joined
+    to the overlapping requests, so the grouping happens in the database.
+    Days on which nobody in a department is away are omitted.
+    """
+    lr, users = m.LeaveRequest, m.User
+    days = select(literal(date_from, Date).label("day")).cte("days", recursive=True)
+    days = days.union_all(
+        select(_next_day(days.c.day, db.get_bind().dialect.name)).where(days.c.day < date_to)
+    )
+    query = select(
+        days.c.day,
+        users.department_id,
+        func.count(func.distinct(lr.user_id))
+    ).select_from(days).join(
+        lr, (lr.start_date <= days.c.day) & (lr.end_date >= days.c.day)
+    ).join(users, users.user_id == lr.user_id).where(
+        lr.status == "Approved",
+        lr.start_date <= date_to,
+        lr.end_date >= date_from
+    ).group_by(days.c.day, users.department_id).order_by(days.c.day, users.department_id)
+    if department_id is not None:
+        query = query.where(users.department_id == department_id)
+
+    departments = dict(db.execute(select(m.Department.department_id, m.Department.name)).all())
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "days": [
+            {
+                "day": day if isinstance(day, date) else date.fromisoformat(day),
+                "department_id": dept_id,
+                "department": departments.get(dept_id),
+                "absent": absent,
+            }
+            for day, dept_id, absent in db.execute(query)
+        ],
+    }
+
+def _upsert_insert(db: Session):
+    """The dialect's INSERT ... ON CONFLICT construct, or None if it has none."""
+    return {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(db.get_bind().dialect.name)
+
+def _add_absence_rows(db: Session, table, rows: list[dict]) -> None:
+    # Portable upsert: add to the day's row, or insert it if there is none.
+    # If a concurrent writer inserts it first, the savepoint is rolled back
+    # and the deltas are added to that row instead.
+    for row in rows:
+        add_to_row = update(table).where(
+            table.c.department_id == row["department_id"], table.c.day == row["day"]
+        ).values(
+            absent_count=table.c.absent_count + row["absent_count"],
+            pending_count=table.c.pending_count + row["pending_count"]
+        )
+        if db.execute(add_to_row).rowcount:
+            continue
+        try:
+            with db.begin_nested():
+                db.execute(insert(table).values(row))
+        except IntegrityError:
+            db.execute(add_to_row)
+
+def adjust_department_absence(db: Session, changes: list[tuple[int | None, date, date, int, int]]) -> None:
+    """
+    Applies (department_id, start, end, absent delta, pending delta) changes to
+    the absence summary within the caller's transaction. Changes are merged
+    per day and written as multi-row upserts in (department, day) order, so
+    concurrent writers lock rows in the same order. Databases without
+    INSERT ... ON CONFLICT get one UPDATE, or INSERT, per row instead.
+    """
+    deltas: dict[tuple[int, date], list[int]] = {}
+    for department_id, start, end, absent, pending in changes:
+        if department_id is None:
+            continue
+        day = start
+        while day <= end:
+            delta = deltas.setdefault((department_id, day), [0, 0])
+            delta[0] += absent
+            delta[1] += pending
+            day += timedelta(days=1)
+    rows = [
+        {"department_id": dept_id, "day": day, "absent_count": absent, "pending_count": pending}
+        for (dept_id, day), (absent, pending) in sorted(deltas.items())
+        if absent or pending
+    ]
+    if not rows:
+        return
+    table = m.DepartmentAbsenceDay.__table__
+    dialect_insert = _upsert_insert(db)
+    if dialect_insert is None:
+        _add_absence_rows(db, table, rows)
+        return
+    for start in range(0, len(rows), ABSENCE_UPSERT_CHUNK):
+        statement = dialect_insert(table).values(rows[start:start + ABSENCE_UPSERT_CHUNK])
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.department_id, table.c.day],
+            set_={
+                "absent_count": table.c.absent_count + statement.excluded.absent_count,
+                "pending_count": table.c.pending_count + statement.excluded.pending_count,
+            }
+        ))
+
+def rebuild_department_absence(db: Session) -> int:
+    """
+    Recomputes the whole absence summary from leave_requests in one
+    transaction: a recursive CTE expands each pending or approved request
+    into its days, which are grouped into summary rows by INSERT ... SELECT.
+    Returns the number of rows written.
+    """
+    lr, users = m.LeaveRequest, m.User
+    spans = select(
+        users.department_id, lr.start_date.label("day"), lr.end_date, lr.status
+    ).join(users, users.user_id == lr.user_id).where(
+        users.department_id.is_not(None),
+        lr.status.in_(["Approved", "Pending"])
+    ).cte("spans", recursive=True)
+    spans = spans.union_all(
+        select(
+            spans.c.department_id, _next_day(spans.c.day, db.get_bind().dialect.name),
+            spans.c.end_date, spans.c.status
+        ).where(spans.c.day < spans.c.end_date)
+    )
+    summary = select(
+        spans.c.department_id,
+        spans.c.day,
+        func.sum(case((spans.c.status == "Approved", 1), else_=0)),
+        func.sum(case((spans.c.status == "Pending", 1), else_=0))
+    ).group_by(spans.c.department_id, spans.c.day)
+
+    table = m.DepartmentAbsenceDay.__table__
+    db.execute(delete(table))
+    db.execute(insert(table).from_select(["department_id", "day", "absent_count", "pending_count"], summary))
+    written = db.scalar(select(func.count()).select_from(table))
+    db.commit()
+    return written
+
+def department_absence(db: Session, department_id: int, date_from: date, date_to: date):
+    """Reads a department's days with anyone away straight from the summary's covering index."""
+    table = m.DepartmentAbsenceDay.__table__
+    return db.execute(
+        select(table.c.day, table.c.absent_count, table.c.pending_count).where(
+            table.c.department_id == department_id,
+            table.c.day.between(date_from, date_to),
+            # Decided requests can leave all-zero rows behind until the next rebuild
+            (table.c.absent_count > 0) | (table.c.pending_count > 0)
+        ).order_by(table.c.day)
+    ).mappings().all()
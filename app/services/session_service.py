@@ -0,0 +1,186 @@
+# app/services/session_service.py
+import hashlib
+import secrets
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Protocol
+from sqlalchemy import Connection, delete, event, insert, inspect, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import all_models as m
+
+def _now() -> datetime:
+    # Naive UTC, like the schema's other timestamps
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def hash_refresh_token(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+class SessionStore(Protocol):
+    """
+    Where refresh-token sessions live. Every method takes the request's
+    session so database-backed stores share its connection; other stores
+    ignore it.
+    """
+    def create(self, db: Session, user_id: int, token_hash: bytes, expires_at: datetime) -> None: ...
+    def rotate(self, db: Session, old_hash: bytes, new_hash: bytes) -> Optional[int]: ...
+    def revoke(self, db: Session, token_hash: bytes) -> bool: ...
+    def revoke_user(self, db: Session, user_id: int) -> int: ...
+    def revoke_user_in_flush(self, connection: Connection, user_id: int) -> None: ...
+
+class DatabaseSessionStore:
+    """Sessions in the auth_sessions table, found through the unique token_hash index."""
+
+    def create(self, db: Session, user_id: int, token_hash: bytes, expires_at: datetime) -> None:
+        # Expired sessions of the same user are swept on the way in
+        db.execute(
+            delete(m.AuthSession).where(m.AuthSession.user_id == user_id, m.AuthSession.expires_at <= _now()),
+            execution_options={"synchronize_session": False}
+        )
+        db.execute(insert(m.AuthSession).values(user_id=user_id, token_hash=token_hash, expires_at=expires_at))
+        db.commit()
+
+    def rotate(self, db: Session, old_hash: bytes, new_hash: bytes) -> Optional[int]:
+        # A single guarded UPDATE, so a token can only be redeemed once even
+        # when two renewals race
+        user_id = db.scalar(
+            update(m.AuthSession).where(
+                m.AuthSession.token_hash == old_hash,
+                m.AuthSession.expires_at > _now()
+            ).values(
+                previous_token_hash=m.AuthSession.token_hash, token_hash=new_hash
+            ).returning(m.AuthSession.user_id),
+            execution_options={"synchronize_session": False}
+        )
+        if user_id is None:
+            # A token that was already rotated away is being replayed, so one
+            # of its holders is not the user: end the session for both.
+            db.execute(
+                delete(m.AuthSession).where(m.AuthSession.previous_token_hash == old_hash),
+                execution_options={"synchronize_session": False}
+            )
+        db.commit()
+        return user_id
+
+    def revoke(self, db: Session, token_hash: bytes) -> bool:
+        result = db.execute(
+            delete(m.AuthSession).where(m.AuthSession.token_hash == token_hash),
+            execution_options={"synchronize_session": False}
+        )
+        db.commit()
+        return result.rowcount > 0
+
+    def revoke_user(self, db: Session, user_id: int) -> int:
+        result = db.execute(
+            delete(m.AuthSession).where(m.AuthSession.user_id == user_id),
+            execution_options={"synchronize_session": False}
+        )
+        db.commit()
+        return result.rowcount
+
+    def revoke_user_in_flush(self, connection: Connection, user_id: int) -> None:
+        connection.execute(delete(m.AuthSession).where(m.AuthSession.user_id == user_id))
+
+class MemorySessionStore:
+    """In-process stand-in for DatabaseSessionStore; sessions are lost on restart."""
+
+    def __init__(self):
+        # Current token hash -> (user_id, expiry, hash of the token it replaced)
+        self._sessions: dict[bytes, tuple[int, datetime, Optional[bytes]]] = {}
+        # Replaced token hash -> current token hash of the same session
+        self._previous: dict[bytes, bytes] = {}
+        self._lock = threading.Lock()
+
+    def _drop(self, token_hash: bytes) -> bool:
+        entry = self._sessions.pop(token_hash, None)
+        if entry is None:
+            return False
+        self._previous.pop(entry[2], None)
+        return True
+
+    def create(self, db: Session, user_id: int, token_hash: bytes, expires_at: datetime) -> None:
+        now = _now()
+        with self._lock:
+            for key in [k for k, (_, expiry, _) in self._sessions.items() if expiry <= now]:
+                self._drop(key)
+            self._sessions[token_hash] = (user_id, expires_at, None)
+
+    def rotate(self, db: Session, old_hash: bytes, new_hash: bytes) -> Optional[int]:
+        with self._lock:
+            entry = self._sessions.get(old_hash)
+            if entry is None:
+                # Replay of a rotated-away token: end that session too
+                current = self._previous.get(old_hash)
+                if current is not None:
+                    self._drop(current)
+                return None
+            self._drop(old_hash)
+            user_id, expires_at, _ = entry
+            if expires_at <= _now():
+                return None
+            self._sessions[new_hash] = (user_id, expires_at, old_hash)
+            self._previous[old_hash] = new_hash
+            return user_id
+
+    def revoke(self, db: Session, token_hash: bytes) -> bool:
+        with self._lock:
+            return self._drop(token_hash)
+
+    def revoke_user(self, db: Session, user_id: int) -> int:
+        with self._lock:
+            keys = [k for k, (owner, _, _) in self._sessions.items() if owner == user_id]
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def revoke_user_in_flush(self, connection: Connection, user_id: int) -> None:
+        self.revoke_user(None, user_id)
+
+session_store: SessionStore = MemorySessionStore() if settings.SESSION_STORE == "memory" else DatabaseSessionStore()
+
+def issue_refresh_token(db: Session, user_id: int) -> str:
+    token = secrets.token_urlsafe(32)
+    expires_at = _now() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    session_store.create(db, user_id, hash_refresh_token(token), expires_at)
+    return token
+
+def rotate_refresh_token(db: Session, token: str) -> Optional[tuple[m.User, str]]:
+    """
+    Redeems a refresh token for a new one within the same session, keeping
+    the session's original expiry. Returns the user and the new token, or
+    None if the token is unknown, already used, revoked or expired. A token
+    that was already rotated away also ends its session, since replaying it
+    means it leaked. Costs one indexed UPDATE and a primary-key read; no
+    password hashing.
+    """
+    new_token = secrets.token_urlsafe(32)
+    user_id = session_store.rotate(db, hash_refresh_token(token), hash_refresh_token(new_token))
+    if user_id is None:
+        return None
+    user = db.get(m.User, user_id)
+    if user is None:
+        return None
+    return user, new_token
+
+def revoke_refresh_token(db: Session, token: str) -> bool:
+    return session_store.revoke(db, hash_refresh_token(token))
+
+def revoke_user_sessions(db: Session, user_id: int) -> int:
+    return session_store.revoke_user(db, user_id)
+
+# Fields that decide who a user is and what they may do
+_SESSION_BOUND_ATTRIBUTES = ("email", "role", "password_hash")
+
+@event.listens_for(m.User, "after_update")
+def _revoke_sessions_on_user_change(mapper, connection, target):
+    # Refresh tokens mint access tokens with the user's current role, so they
+    # must not outlive a demotion or a password reset. Runs in the flush, so
+    # the revocation commits or rolls back with the change.
+    state = inspect(target)
+    if any(state.attrs[key].history.has_changes() for key in _SESSION_BOUND_ATTRIBUTES):
+        session_store.revoke_user_in_flush(connection, target.user_id)
+
+@event.listens_for(m.User, "after_delete")
+def _revoke_sessions_on_user_delete(mapper, connection, target):
+    # Covered by ON DELETE CASCADE where foreign keys are enforced
+    session_store.revoke_user_in_flush(connection, target.user_id)
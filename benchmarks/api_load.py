@@ -0,0 +1,264 @@
+# benchmarks/api_load.py
+"""
+Reproducible API load benchmark.
+
+  seed     fills a database with benchmark users, leave types, balances and
+           leave requests, using the app's models
+  run      drives a running server's main endpoints at a fixed concurrency,
+           prints throughput and p50/p95/p99 latency and saves them as JSON
+  compare  diffs two saved runs and fails if p95 latency regressed
+
+    python benchmarks/api_load.py seed --database-url sqlite:///./bench.db --users 1000
+    DATABASE_URL=sqlite:///./bench.db uvicorn app.main:app --port 8000
+    python benchmarks/api_load.py run --url http://127.0.0.1:8000 --concurrency 16 \\
+        --requests 2000 --output results/v1.4.json
+    python benchmarks/api_load.py compare results/v1.3.json results/v1.4.json
+
+Every seeded account, including bench-admin@example.com, uses the password
+given by --password (default "bench-password").
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+ADMIN_EMAIL = "bench-admin@example.com"
+USER_EMAIL = "bench-user-{}@example.com"
+LEAVE_TYPES = [("Bench Casual", 12, False), ("Bench Earned", 18, True), ("Bench Sick", 10, False)]
+STATUSES = ["Pending", "Approved", "Approved", "Rejected"]
+
+def seed(args):
+    # Must be set before the app modules build their engine
+    os.environ["DATABASE_URL"] = args.database_url
+    from sqlalchemy import insert, select
+    from app.database import Base, SessionLocal, engine
+    from app.models import all_models as m
+    from app.services.auth_service import pwd_context
+
+    rng = random.Random(args.random_seed)
+    year = date.today().year
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        if db.scalar(select(m.User.user_id).where(m.User.email == ADMIN_EMAIL)):
+            print(f"[-] {args.database_url} is already seeded; use a fresh database.")
+            sys.exit(1)
+        # One bcrypt hash shared by every account keeps seeding fast
+        password_hash = pwd_context.hash(args.password)
+        department = m.Department(name="Benchmark")
+        leave_types = [m.LeaveType(name=name, annual_quota=quota, carry_forward=cf) for name, quota, cf in LEAVE_TYPES]
+        db.add_all([department, *leave_types])
+        db.flush()
+
+        users = [{
+            "email": ADMIN_EMAIL, "first_name": "Bench", "last_name": "Admin", "password_hash": password_hash,
+            "department_id": department.department_id, "join_date": date(year - 1, 1, 1), "role": "Admin",
+        }] + [{
+            "email": USER_EMAIL.format(i), "first_name": "Bench", "last_name": f"User {i}", "password_hash": password_hash,
+            "department_id": department.department_id, "join_date": date(year - 1, 1, 1), "role": "Employee",
+        } for i in range(args.users)]
+        user_ids = db.scalars(
+            insert(m.User).returning(m.User.user_id, sort_by_parameter_order=True), users
+        ).all()
+        admin_id, employee_ids = user_ids[0], user_ids[1:]
+
+        db.execute(insert(m.LeaveBalance), [
+            {"user_id": user_id, "leave_type_id": lt.leave_type_id, "year": year,
+             "balance_days": lt.annual_quota, "used_days": 0}
+            for user_id in user_ids for lt in leave_types
+        ])
+
+        requests = []
+        applied_base = datetime(year, 1, 1)
+        for user_id in employee_ids:
+            # Non-overlapping two-day requests, one per fortnight
+            for n in range(args.requests_per_user):
+                start = date(year, 1, 5) + timedelta(days=14 * n)
+                status = rng.choice(STATUSES)
+                requests.append({
+                    "user_id": user_id, "leave_type_id": rng.choice(leave_types).leave_type_id,
+                    "start_date": start, "end_date": start + timedelta(days=1), "total_days": 2,
+                    "is_half_day": False, "reason": "benchmark", "status": status,
+                    "applied_at": applied_base + timedelta(minutes=rng.randrange(525600)),
+                    "approved_by": admin_id if status != "Pending" else None,
+                })
+        for start in range(0, len(requests), 5000):
+            db.execute(insert(m.LeaveRequest), requests[start:start + 5000])
+        db.commit()
+    print(f"[+] Seeded {args.users} users, {len(LEAVE_TYPES)} leave types and {len(requests)} leave requests "
+          f"into {engine.url.render_as_string(hide_password=True)}")
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(fraction * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def drive(session, concurrency, count, call):
+    """Runs `call(i)` `count` times on `concurrency` threads; returns stats for the run."""
+    def timed(i):
+        started = time.perf_counter()
+        try:
+            status = call(i).status_code
+        except Exception as e:
+            status = type(e).__name__
+        return status, time.perf_counter() - started
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(count)))
+    elapsed = time.perf_counter() - start
+
+    statuses = {}
+    for status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    latencies = sorted(latency for status, latency in results if status == 200)
+    ms = lambda value: None if value is None else round(1000 * value, 2)
+    return {
+        "requests": count,
+        "ok": len(latencies),
+        "statuses": statuses,
+        "seconds": round(elapsed, 3),
+        "throughput": round(len(latencies) / elapsed, 2),
+        "p50_ms": ms(percentile(latencies, 0.50)),
+        "p95_ms": ms(percentile(latencies, 0.95)),
+        "p99_ms": ms(percentile(latencies, 0.99)),
+        "max_ms": ms(latencies[-1] if latencies else None),
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(args):
+    import requests
+
+    url = args.url.rstrip("/")
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=args.concurrency, pool_maxsize=args.concurrency)
+    session.mount("http://", adapter); session.mount("https://", adapter)
+
+    def token(email):
+        response = session.post(f"{url}/auth/token", data={"username": email, "password": args.password})
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    admin = token(ADMIN_EMAIL)
+    employees = [token(USER_EMAIL.format(i)) for i in range(args.token_users)]
+    logins = args.login_requests if args.login_requests is not None else max(1, args.requests // 10)
+
+    scenarios = {
+        "POST /auth/token": (logins, lambda i: session.post(
+            f"{url}/auth/token", data={"username": USER_EMAIL.format(i % args.token_users), "password": args.password})),
+        "GET /leave-requests/": (args.requests, lambda i: session.get(
+            f"{url}/leave-requests/", headers=employees[i % len(employees)])),
+        "GET /users/me/balances": (args.requests, lambda i: session.get(
+            f"{url}/users/me/balances", headers=employees[i % len(employees)])),
+        "GET /admin/leave-requests": (args.requests, lambda i: session.get(
+            f"{url}/admin/leave-requests", headers=admin, params={"limit": 100})),
+        "GET /admin/leave-requests?status=Pending": (args.requests, lambda i: session.get(
+            f"{url}/admin/leave-requests", headers=admin, params={"status": "Pending", "limit": 100})),
+    }
+    selected = {name: s for name, s in scenarios.items() if not args.only or any(o in name for o in args.only)}
+
+    results = {}
+    print(f"{'endpoint':<42} | {'req/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | errors")
+    print("-" * 92)
+    for name, (count, call) in selected.items():
+        # Warm connections and caches so the first requests do not skew the tail
+        drive(session, args.concurrency, min(count, args.concurrency * 2), call)
+        stats = drive(session, args.concurrency, count, call)
+        results[name] = stats
+        fmt = lambda v: "-" if v is None else f"{v:.1f}"
+        print(f"{name:<42} | {stats['throughput']:>8.1f} | {fmt(stats['p50_ms']):>8} | "
+              f"{fmt(stats['p95_ms']):>8} | {fmt(stats['p99_ms']):>8} | {stats['requests'] - stats['ok']}")
+
+    if args.output:
+        report = {
+            "meta": {
+                "url": url,
+                "revision": git_revision(),
+                "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "concurrency": args.concurrency,
+                "python": platform.python_version(),
+                "host": platform.node(),
+            },
+            "endpoints": results,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[+] Saved {args.output}")
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    print(f"baseline {baseline['meta'].get('revision')} vs candidate {candidate['meta'].get('revision')}")
+    print(f"{'endpoint':<42} | {'req/s':>16} | {'p95 ms':>18} | {'p99 ms':>18}")
+    print("-" * 104)
+    regressions = []
+    for name, new in candidate["endpoints"].items():
+        old = baseline["endpoints"].get(name)
+        if not old:
+            continue
+        def delta(key):
+            if not old.get(key) or new.get(key) is None:
+                return None
+            return 100 * (new[key] - old[key]) / old[key]
+        cells = []
+        for key in ("throughput", "p95_ms", "p99_ms"):
+            change = delta(key)
+            cells.append(f"{new[key]:>9.1f} {'' if change is None else f'{change:+6.1f}%':>7}")
+        print(f"{name:<42} | " + " | ".join(cells))
+        p95_change = delta("p95_ms")
+        if p95_change is not None and p95_change > args.threshold:
+            regressions.append(f"{name}: p95 {old['p95_ms']}ms -> {new['p95_ms']}ms ({p95_change:+.1f}%)")
+    for regression in regressions:
+        print(f"[-] Regression: {regression}")
+    if regressions:
+        sys.exit(1)
+    print(f"[+] No p95 regression above {args.threshold:.0f}%.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="fill a fresh database with benchmark data")
+    seed_parser.add_argument("--database-url", required=True)
+    seed_parser.add_argument("--users", type=int, default=1000)
+    seed_parser.add_argument("--requests-per-user", type=int, default=10)
+    seed_parser.add_argument("--password", default="bench-password")
+    seed_parser.add_argument("--random-seed", type=int, default=42)
+
+    run_parser = commands.add_parser("run", help="load a running server and report latencies")
+    run_parser.add_argument("--url", required=True)
+    run_parser.add_argument("--concurrency", type=int, default=8)
+    run_parser.add_argument("--requests", type=int, default=1000, help="requests per read endpoint")
+    run_parser.add_argument("--login-requests", type=int, help="logins to time (default: requests / 10)")
+    run_parser.add_argument("--token-users", type=int, default=20, help="seeded users to spread reads over")
+    run_parser.add_argument("--password", default="bench-password")
+    run_parser.add_argument("--only", nargs="+", help="only endpoints whose name contains one of these")
+    run_parser.add_argument("--output", help="save the results as JSON")
+
+    compare_parser = commands.add_parser("compare", help="diff two saved runs")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="allowed p95 increase in percent")
+
+    args = parser.parse_args()
+    {"seed": seed, "run": run, "compare": compare}[args.command](args)
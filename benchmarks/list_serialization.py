@@ -0,0 +1,101 @@
+# benchmarks/list_serialization.py
+"""
+Compares the ways a page of leave requests can be turned into JSON:
+
+  orm+schema   ORM objects with joinedload relationships, validated through
+               the response schemas with from_attributes (the old path)
+  rows+schema  the column rows the list endpoints select, validated through a
+               TypeAdapter of the same schemas
+  rows+orjson  the column rows shaped into dicts by leave_service and emitted
+               with orjson (what the endpoints do now)
+
+All three must produce the same JSON; the script exits non-zero if not.
+
+    python benchmarks/api_load.py seed --database-url sqlite:///./bench.db --users 200
+    python benchmarks/list_serialization.py --database-url sqlite:///./bench.db --limit 100
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def orm_page(db, m, limit, user_id=None):
+    from sqlalchemy.orm import joinedload
+    query = db.query(m.LeaveRequest).options(joinedload(m.LeaveRequest.user), joinedload(m.LeaveRequest.leave_type))
+    if user_id is not None:
+        query = query.filter(m.LeaveRequest.user_id == user_id)
+    return query.order_by(m.LeaveRequest.applied_at.desc(), m.LeaveRequest.request_id.desc()).limit(limit).all()
+
+def timed(fn, iterations):
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        body = fn()
+    return (time.perf_counter() - start) / iterations, body
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", required=True, help="database seeded with leave requests")
+    parser.add_argument("--limit", type=int, default=100, help="page size")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    # Must be set before the app modules build their engine
+    os.environ["DATABASE_URL"] = args.database_url
+    from pydantic import TypeAdapter
+    from app.database import SessionLocal
+    from app.json_response import dumps
+    from app.models import all_models as m
+    from app.schemas import leave_schemas as ls
+    from app.services import leave_service
+
+    admin_adapter = TypeAdapter(List[ls.AdminLeaveRequestResponse])
+    user_adapter = TypeAdapter(List[ls.LeaveRequestResponse])
+    with SessionLocal() as db:
+        user_id = db.query(m.LeaveRequest.user_id).order_by(
+            m.LeaveRequest.applied_at.desc(), m.LeaveRequest.request_id.desc()
+        ).limit(1).scalar()
+        if user_id is None:
+            print("[-] No leave requests to serialize; seed the database first.")
+            sys.exit(1)
+
+        cases = {
+            "GET /admin/leave-requests": (
+                admin_adapter, lambda: orm_page(db, m, args.limit),
+                lambda: leave_service.list_leave_requests(db, None, 1, args.limit)[0],
+            ),
+            "GET /leave-requests/": (
+                user_adapter, lambda: orm_page(db, m, args.limit, user_id),
+                lambda: leave_service.get_user_leave_requests(db, user_id, 1, args.limit)[0],
+            ),
+        }
+        failed = False
+        print(f"[*] {SessionLocal.kw['bind'].dialect.name}, pages of up to {args.limit}, {args.iterations} iterations")
+        print(f"{'endpoint':<28} | {'path':<12} | {'ms/page':>8} | {'speedup':>7}")
+        print("-" * 66)
+        for name, (adapter, load_orm, load_rows) in cases.items():
+            # Identity-map hits would flatter the ORM path; start each page cold
+            def orm_schema():
+                db.expunge_all()
+                return adapter.dump_json(adapter.validate_python(load_orm(), from_attributes=True))
+            results = {
+                "orm+schema": timed(orm_schema, args.iterations),
+                "rows+schema": timed(lambda: adapter.dump_json(adapter.validate_python(load_rows())), args.iterations),
+                "rows+orjson": timed(lambda: dumps(load_rows()), args.iterations),
+            }
+            baseline, expected = results["orm+schema"]
+            for path, (seconds, body) in results.items():
+                print(f"{name:<28} | {path:<12} | {1000 * seconds:>8.3f} | {baseline / seconds:>6.2f}x")
+                if json.loads(body) != json.loads(expected):
+                    print(f"[-] {name}: {path} output differs from orm+schema")
+                    failed = True
+    if failed:
+        sys.exit(1)
+    print("[+] All paths produce identical JSON.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/login_throughput.py
+"""
+Measures bcrypt login throughput per core.
+
+In-process mode (default) pushes password verifications through the same
+bounded executor that /auth/token uses, once per worker count, and reports
+logins/second overall and per worker. HTTP mode (--url) drives a running
+server's /auth/token endpoint at the given concurrency instead.
+
+    python benchmarks/login_throughput.py --logins 200 --workers 1 2 4
+    python benchmarks/login_throughput.py --url http://127.0.0.1:8000 \\
+        --email admin@example.com --password secret --concurrency 16
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def bench_in_process(logins, worker_counts):
+    from app.services.auth_service import BoundedExecutor, pwd_context
+
+    password = "benchmark-password"
+    hashed = pwd_context.hash(password)
+    cpus = os.cpu_count() or 1
+    print(f"[*] {cpus} CPU(s) available, bcrypt rounds={pwd_context.handler('bcrypt').default_rounds}")
+    print(f"{'workers':>8} | {'logins/s':>10} | {'per core':>10} | {'ms/login':>9}")
+    print("-" * 46)
+    for workers in worker_counts:
+        executor = BoundedExecutor(max_workers=workers, max_queue=logins, thread_name_prefix="bench")
+        start = time.perf_counter()
+        futures = [executor.submit(pwd_context.verify, password, hashed) for _ in range(logins)]
+        wait(futures)
+        elapsed = time.perf_counter() - start
+        assert all(f.result() for f in futures)
+        rate = logins / elapsed
+        cores = min(workers, cpus)
+        print(f"{workers:>8} | {rate:>10.1f} | {rate / cores:>10.1f} | {1000 * elapsed / logins * workers:>9.1f}")
+
+def bench_http(url, email, password, logins, concurrency):
+    import requests
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter); session.mount("https://", adapter)
+    form = {"username": email, "password": password}
+
+    def login():
+        started = time.perf_counter()
+        response = session.post(f"{url}/auth/token", data=form)
+        return response.status_code, time.perf_counter() - started
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: login(), range(logins)))
+    elapsed = time.perf_counter() - start
+
+    codes = {}
+    for code, _ in results:
+        codes[code] = codes.get(code, 0) + 1
+    latencies = sorted(latency for code, latency in results if code == 200)
+    ok = len(latencies)
+    print(f"[*] {logins} logins at concurrency {concurrency} in {elapsed:.2f}s")
+    print(f"[*] Status codes: {codes}")
+    if ok:
+        print(f"[*] Throughput: {ok / elapsed:.1f} logins/s")
+        print(f"[*] p50={1000 * latencies[ok // 2]:.1f}ms p99={1000 * latencies[min(ok - 1, int(ok * 0.99))]:.1f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--url")
+    parser.add_argument("--email")
+    parser.add_argument("--password")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    if args.url:
+        if not (args.email and args.password):
+            parser.error("--url requires --email and --password")
+        bench_http(args.url.rstrip("/"), args.email, args.password, args.logins, args.concurrency)
+    else:
+        bench_in_process(args.logins, args.workers)
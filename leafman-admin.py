@@ -1,10 +1,14 @@
 # leafman-admin.py
 import cmd
 import os
+import sys
 import requests
 import json
 from getpass import getpass
 from dotenv import load_dotenv
+from leafman_client import ApiSession, fetch_concurrently, iter_pages
+from leafman_render import pretty_print_table
+from leafman_batch import BATCH_SIZE, parse_id_ranges, main as run_batch
 
 BANNER = """
                     .
@@ -19,41 +23,18 @@ BANNER = """
     >> Leafman Admin Console v1.0 <<
 """
 
-def pretty_print_table(data_list, headers):
-    if not data_list: print("[*] No data to display."); return
-    header_keys = list(headers.keys())
-    def get_nested_value(row, key):
-        if '.' not in key: return row.get(key, "")
-        value = row
-        for part in key.split('.'):
-            if isinstance(value, dict): value = value.get(part)
-            else: return ""
-        return value if value is not None else ""
-    col_widths = {key: len(str(header)) for key, header in headers.items()}
-    for row in data_list:
-        for key in header_keys:
-            value = get_nested_value(row, key)
-            col_widths[key] = max(col_widths[key], len(str(value)))
-    header_line = " | ".join(headers[key].ljust(col_widths[key]) for key in header_keys)
-    print("\n" + header_line); print("-" * len(header_line))
-    for row in data_list:
-        row_values = [str(get_nested_value(row, key)).ljust(col_widths[key]) for key in header_keys]
-        print(" | ".join(row_values))
-    print()
-
 class LeafmanAdminCLI(cmd.Cmd):
     intro = BANNER + "\nWelcome, Admin! Type 'help' or '?' to list commands.\n"
     prompt = '(leafman-admin) '
     
-    def __init__(self, api_base_url):
-        super().__init__(); self.api_base_url = api_base_url; self.token = None; self.current_user = None
+    def __init__(self, session):
+        super().__init__(); self.session = session; self.token = None; self.current_user = None
 
-    def _make_request(self, method, endpoint, data=None, is_json=True):
-        headers = {'Authorization': f'Bearer {self.token}'} if self.token else {}
-        url = f"{self.api_base_url}{endpoint}"; kwargs = {'headers': headers}
+    def _make_request(self, method, endpoint, data=None, is_json=True, params=None):
+        kwargs = {'params': params}
         if data: kwargs['json' if is_json else 'data'] = data
         try:
-            response = requests.request(method.upper(), url, **kwargs); response.raise_for_status()
+            response = self.session.request(method, endpoint, **kwargs); response.raise_for_status()
             return response.json() if response.text else {}
         except requests.exceptions.HTTPError as e:
             print(f"\n[-] API Error ({e.response.status_code}):")
@@ -67,6 +48,19 @@ class LeafmanAdminCLI(cmd.Cmd):
         if not is_admin: print("[-] Admin privileges required.")
         return is_admin
 
+    def _print_listing(self, endpoint, headers, params=None):
+        """Prints every page of a cursor-paginated listing as it arrives."""
+        try: pretty_print_table(iter_pages(self.session, endpoint, params), headers, paged=True)
+        except requests.exceptions.HTTPError as e: print(f"\n[-] API Error ({e.response.status_code}): {e.response.text[:200]}")
+        except requests.exceptions.RequestException as e: print(f"\n[-] Connection Error: {e}")
+
+    def _fetch_pending_summary(self):
+        """Returns e.g. '12' or '100+' pending requests, or None if they cannot be listed."""
+        try: response = self.session.request('GET', '/admin/leave-requests', params={'status': 'Pending', 'limit': 100})
+        except requests.exceptions.RequestException: return None
+        if not response.ok: return None
+        return f"{len(response.json())}{'+' if response.headers.get('X-Next-Cursor') else ''}"
+
     def do_login(self, arg):
         args = arg.split();
         if not 1 <= len(args) <= 2: print("[-] Usage: login <email> [password]"); return
@@ -74,21 +68,27 @@ class LeafmanAdminCLI(cmd.Cmd):
         form_data = {'username': email, 'password': password}
         token_data = self._make_request('POST', '/auth/token', data=form_data, is_json=False)
         if token_data and 'access_token' in token_data:
-            self.token = token_data['access_token']; self.current_user = self._make_request('GET', '/users/me')
+            self.token = self.session.token = token_data['access_token']
+            self.session.refresh_token = token_data.get('refresh_token')
+            # The pending queue is fetched alongside the profile; non-admins just get a 403 for it
+            self.current_user, pending = fetch_concurrently(
+                lambda: self._make_request('GET', '/users/me'), self._fetch_pending_summary
+            )
             if self.current_user and self.current_user.get('role') == 'Admin':
                 print("\n[+] Admin login successful."); self.prompt = f'(admin:{email}) '
+                if pending: print(f"[*] {pending} request(s) awaiting a decision.")
             else: print("\n[-] User is not an Admin or failed to fetch profile."); self.do_logout(None)
         else: print("\n[-] Login failed. Check credentials.")
 
     def do_logout(self, arg):
-        self.token = None; self.current_user = None; self.prompt = '(leafman-admin) '; print("[*] Logged out.")
+        self.session.logout(); self.token = None; self.current_user = None; self.prompt = '(leafman-admin) '; print("[*] Logged out.")
 
     def do_whoami(self, arg):
         if not self.token: print("[-] Not logged in."); return
         pretty_print_table([self.current_user], {"user_id": "ID", "first_name": "First Name", "last_name": "Last Name", "email": "Email", "role": "Role"})
 
     def do_show(self, arg):
-        """Display info. Usage: show [pending|all_requests|balance|departments|leavetypes]"""
+        """Display info. Usage: show [pending|all_requests|balance|departments|leavetypes|holidays]"""
         if not self._require_admin(): return
         
         # THE FIX: Added 'reason' to the headers for pending and all_requests
@@ -107,17 +107,24 @@ class LeafmanAdminCLI(cmd.Cmd):
             "departments": {
                 "department_id": "ID", "name": "Department Name"
             },
+            "holidays": {
+                "holiday_id": "ID", "holiday_date": "Date", "name": "Holiday", "country_code": "Country"
+            },
             "balance": {
                 "leave_type.name": "Leave Type", "year": "Year",
                 "balance_days": "Total", "used_days": "Used",
             },
         }
         
+        # Cursor-paginated listings, printed page by page
+        listing_map = {
+            "pending": ("/admin/leave-requests", {"status": "Pending"}),
+            "all_requests": ("/admin/leave-requests", None),
+        }
         endpoint_map = {
-            "pending": "/admin/leave-requests?status=Pending",
-            "all_requests": "/admin/leave-requests",
             "leavetypes": "/leave-requests/types",
             "departments": "/admin/departments/",
+            "holidays": "/admin/holidays",
             "balance": "/users/me/balances",
         }
         
@@ -125,8 +132,12 @@ class LeafmanAdminCLI(cmd.Cmd):
         if arg == "requests":
             print("[!] Note: 'show requests' shows your personal request history.")
             personal_headers = {"request_id": "ID", "leave_type.name": "Type", "start_date": "Start", "end_date": "End", "status": "Status", "reason": "Reason"}
-            response = self._make_request('GET', '/leave-requests/')
-            if response is not None: pretty_print_table(response, personal_headers)
+            self._print_listing('/leave-requests/', personal_headers)
+            return
+
+        if arg in listing_map:
+            endpoint, params = listing_map[arg]
+            self._print_listing(endpoint, headers_map[arg], params)
             return
 
         if arg not in endpoint_map:
@@ -142,6 +153,7 @@ class LeafmanAdminCLI(cmd.Cmd):
         print("\nDisplay information. Usage: show <option>")
         print("  pending      - All PENDING leave requests."); print("  all_requests - ALL leave requests in the system.")
         print("  leavetypes   - All configured leave types."); print("  departments  - All configured departments.")
+        print("  holidays     - All configured holidays.")
         print("  balance      - Your personal leave balance.\n")
 
     def do_adduser(self, arg):
@@ -155,24 +167,95 @@ class LeafmanAdminCLI(cmd.Cmd):
             if response: print("\n[+] User created successfully!"); pretty_print_table([response], {"user_id":"ID","first_name":"First","last_name":"Last","email":"Email"})
         except Exception as e: print(f"\n[-] Error: {e}")
 
+    def _stream_records(self, method, endpoint, **kwargs):
+        """Yields the records of an NDJSON streaming endpoint as they arrive."""
+        # No read timeout: the server may work for a while between records
+        response = self.session.request(method, endpoint, stream=True, timeout=(self.session.timeout, None), **kwargs)
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if line: yield json.loads(line)
+
+    def do_import(self, arg):
+        """[Admin] Bulk-create users from a CSV or JSONL file. Usage: import <file>"""
+        if not self._require_admin(): return
+        path = arg.strip()
+        if not path: print("[-] Usage: import <file.csv|file.jsonl>"); return
+        failures = []
+        try:
+            with open(path, 'rb') as f:
+                for record in self._stream_records('POST', '/admin/users:import', files={'file': (os.path.basename(path), f)}):
+                    if record['type'] == 'error': failures.append(record)
+                    elif record['type'] == 'progress': print(f"\r[*] {record['rows']} rows read, {record['created']} created, {record['failed']} failed", end="", flush=True)
+                    else: print(f"\n[+] Import finished: {record['created']} of {record['rows']} user(s) created, {record['failed']} failed.")
+            if failures: pretty_print_table(failures, {"line": "Line", "email": "Email", "detail": "Error"})
+        except requests.exceptions.HTTPError as e: print(f"\n[-] API Error ({e.response.status_code}): {e.response.text[:200]}")
+        except requests.exceptions.RequestException as e: print(f"\n[-] Connection Error: {e}")
+        except OSError as e: print(f"[-] Cannot read file: {e}")
+
+    def do_rollover(self, arg):
+        """[Admin] Create next year's balances with carry-forward. Usage: rollover <from_year> [after_user_id]"""
+        if not self._require_admin(): return
+        try: args = [int(a) for a in arg.split()]; from_year = args[0]; after_user_id = args[1] if len(args) > 1 else 0
+        except (ValueError, IndexError): print("[-] Usage: rollover <from_year> [after_user_id]"); return
+        record = None
+        try:
+            for record in self._stream_records('POST', '/admin/leave-balances:rollover', params={'from_year': from_year, 'after_user_id': after_user_id}):
+                if record['type'] == 'progress': print(f"\r[*] {record['users']} user(s) done, {record['inserted']} balance(s) created, last user {record['last_user_id']}", end="", flush=True)
+                else: print(f"\n[+] Rollover to {record['to_year']} finished: {record['inserted']} balance(s) created for {record['users']} user(s).")
+        except requests.exceptions.HTTPError as e: print(f"\n[-] API Error ({e.response.status_code}): {e.response.text[:200]}")
+        except requests.exceptions.RequestException as e:
+            print(f"\n[-] Connection Error: {e}")
+            if record: print(f"[*] Resume with: rollover {from_year} {record['last_user_id']}")
+
+    def do_export(self, arg):
+        """[Admin] Export leave requests to a file. Usage: export <file.csv|file.ndjson> [from YYYY-MM-DD] [to YYYY-MM-DD]"""
+        if not self._require_admin(): return
+        args = arg.split()
+        if not 1 <= len(args) <= 3: print("[-] Usage: export <file.csv|file.ndjson> [from] [to]"); return
+        path = args[0]; fmt = 'ndjson' if path.lower().endswith(('.ndjson', '.jsonl')) else 'csv'
+        params = {'format': fmt, **dict(zip(['from', 'to'], args[1:]))}
+        written = 0
+        try:
+            with self.session.request('GET', '/admin/leave-requests/export', params=params, stream=True, timeout=(self.session.timeout, None)) as response:
+                if not response.ok: print(f"\n[-] API Error ({response.status_code}): {response.text[:200]}"); return
+                with open(path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        f.write(chunk); written += len(chunk)
+                        print(f"\r[*] {written / 1024:.0f} KiB written", end="", flush=True)
+            print(f"\n[+] Export saved to {path}.")
+        except requests.exceptions.RequestException as e: print(f"\n[-] Connection Error: {e}")
+        except OSError as e: print(f"[-] Cannot write file: {e}")
+
+    def _decide(self, arg, status, note):
+        """Sends one decision per id, through the batch endpoint when there are several."""
+        ids = parse_id_ranges(arg)
+        if len(ids) == 1:
+            response = self._make_request('PATCH', f'/admin/leave-requests/{ids[0]}', data={"status": status, "approval_note": note})
+            if response: print(f"\n[+] Request {ids[0]} {status.lower()}.")
+            return
+        decisions = [{"request_id": request_id, "status": status, "approval_note": note} for request_id in ids]
+        for start in range(0, len(decisions), BATCH_SIZE):
+            response = self._make_request('PATCH', '/admin/leave-requests:batch', data={"decisions": decisions[start:start + BATCH_SIZE]})
+            if not response: return
+            print(f"\n[+] {response['processed']} request(s) {status.lower()}, {response['failed']} failed.")
+            failures = [r for r in response['results'] if not r['ok']]
+            if failures: pretty_print_table(failures, {"request_id": "ID", "detail": "Error"})
+
     def do_approve(self, arg):
-        """[Admin] Approve a request. Usage: approve <id>"""
+        """[Admin] Approve requests. Usage: approve <id>[-<id>][,<id>...]  e.g. approve 3-10,12"""
         if not self._require_admin(): return
-        try: 
-            request_id=int(arg); note=input("Note (optional): "); data={"status":"Approved","approval_note":note}
-            response=self._make_request('PATCH',f'/admin/leave-requests/{request_id}',data=data);
-            if response: print(f"\n[+] Request {request_id} approved.")
-        except ValueError: print("[-] Invalid ID.")
+        try: parse_id_ranges(arg)
+        except ValueError as e: print(f"[-] Invalid ID: {e}"); return
+        note=input("Note (optional): "); self._decide(arg, "Approved", note)
 
     def do_reject(self, arg):
-        """[Admin] Reject a request. Usage: reject <id>"""
+        """[Admin] Reject requests. Usage: reject <id>[-<id>][,<id>...]  e.g. reject 3-10,12"""
         if not self._require_admin(): return
-        try: 
-            request_id=int(arg); note=input("Reason (required): ");
-            if not note: print("[-] Reason required."); return
-            data={"status":"Rejected","approval_note":note}; response=self._make_request('PATCH',f'/admin/leave-requests/{request_id}',data=data)
-            if response: print(f"\n[+] Request {request_id} rejected.")
-        except ValueError: print("[-] Invalid ID.")
+        try: parse_id_ranges(arg)
+        except ValueError as e: print(f"[-] Invalid ID: {e}"); return
+        note=input("Reason (required): ")
+        if not note: print("[-] Reason required."); return
+        self._decide(arg, "Rejected", note)
 
     def do_add_leavetype(self, arg):
         """[Admin] Create a new leave type."""
@@ -191,6 +274,15 @@ class LeafmanAdminCLI(cmd.Cmd):
             if response: print("\n[+] Department created!"); pretty_print_table([response],{"department_id":"ID","name":"Name"})
         except Exception as e: print(f"\n[-] Error: {e}")
 
+    def do_add_holiday(self, arg):
+        """[Admin] Add a public holiday to the working-day calendar."""
+        if not self._require_admin(): return
+        try:
+            name=input("Holiday Name: "); holiday_date=input("Date (YYYY-MM-DD): "); country=input("Country code (blank for all): ").strip().upper() or None
+            response=self._make_request('POST','/admin/holidays',data={"name":name,"holiday_date":holiday_date,"country_code":country})
+            if response: print("\n[+] Holiday added!"); pretty_print_table([response],{"holiday_id":"ID","holiday_date":"Date","name":"Holiday","country_code":"Country"})
+        except Exception as e: print(f"\n[-] Error: {e}")
+
     def do_exit(self, arg):
         """Exit the Admin Console."""
         print("Exiting Admin Console."); return True
@@ -201,5 +293,6 @@ class LeafmanAdminCLI(cmd.Cmd):
 
 if __name__ == '__main__':
     load_dotenv(); api_url = os.getenv('LEAFMAN_API_URL', 'http://127.0.0.1:8000')
-    try: LeafmanAdminCLI(api_url).cmdloop()
+    if sys.argv[1:2] == ['run']: sys.exit(run_batch(sys.argv[2:], api_url))
+    try: LeafmanAdminCLI(ApiSession.from_env(api_url)).cmdloop()
     except KeyboardInterrupt: print("\n[*] Aborted by user. Exiting.")
\ No newline at end of file
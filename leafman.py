@@ -4,6 +4,8 @@ import requests
 import json
 from getpass import getpass
 from dotenv import load_dotenv
+from leafman_client import ApiSession, fetch_concurrently, iter_pages
+from leafman_render import pretty_print_table
 
 BANNER = """
                     .
@@ -18,65 +20,27 @@ BANNER = """
     >> Leafman Employee CLI v1.0 <<
 """
 
-def pretty_print_table(data_list, headers):
-    """
-    Prints a list of dictionaries in a neat, tabular format.
-    Handles nested keys using dot notation (e.g., 'leave_type.name').
-    """
-    if not data_list:
-        print("[*] No data to display.")
-        return
-
-    header_keys = list(headers.keys())
-    
-    def get_nested_value(row, key):
-        """Helper to retrieve a value from a potentially nested dictionary."""
-        if '.' not in key:
-            return row.get(key, "")
-        
-        value = row
-        for part in key.split('.'):
-            if isinstance(value, dict):
-                value = value.get(part)
-            else:
-                return ""
-        return value if value is not None else ""
-
-    col_widths = {key: len(str(header)) for key, header in headers.items()}
-    for row in data_list:
-        for key in header_keys:
-            value = get_nested_value(row, key)
-            col_widths[key] = max(col_widths[key], len(str(value)))
-
-    header_line = " | ".join(headers[key].ljust(col_widths[key]) for key in header_keys)
-    print("\n" + header_line)
-    print("-" * len(header_line))
-
-    for row in data_list:
-        row_values = []
-        for key in header_keys:
-            value = get_nested_value(row, key)
-            row_values.append(str(value).ljust(col_widths[key]))
-        print(" | ".join(row_values))
-    print()
+BALANCE_HEADERS = {
+    "leave_type.name": "Leave Type", "year": "Year",
+    "balance_days": "Total Allowance", "used_days": "Days Used",
+}
 
 class LeafmanCLI(cmd.Cmd):
     intro = BANNER + "\nWelcome! Type 'help' or '?' to list commands.\n"
     prompt = '(leafman) '
     
-    def __init__(self, api_base_url):
+    def __init__(self, session):
         super().__init__()
-        self.api_base_url = api_base_url
+        self.session = session
         self.token = None
         self.current_user = None
+        self.leave_types = None
 
     def _make_request(self, method, endpoint, data=None, is_json=True):
-        headers = {'Authorization': f'Bearer {self.token}'} if self.token else {}
-        url = f"{self.api_base_url}{endpoint}"
-        kwargs = {'headers': headers}
+        kwargs = {}
         if data: kwargs['json' if is_json else 'data'] = data
         try:
-            response = requests.request(method.upper(), url, **kwargs)
+            response = self.session.request(method, endpoint, **kwargs)
             response.raise_for_status()
             return response.json() if response.text else {}
         except requests.exceptions.HTTPError as e:
@@ -87,6 +51,15 @@ class LeafmanCLI(cmd.Cmd):
         except requests.exceptions.RequestException as e:
             print(f"\n[-] Connection Error: {e}"); return None
 
+    def _print_listing(self, endpoint, headers):
+        """Prints every page of a cursor-paginated listing as it arrives."""
+        try:
+            pretty_print_table(iter_pages(self.session, endpoint), headers, paged=True)
+        except requests.exceptions.HTTPError as e:
+            print(f"\n[-] API Error ({e.response.status_code}): {e.response.text[:200]}")
+        except requests.exceptions.RequestException as e:
+            print(f"\n[-] Connection Error: {e}")
+
     def do_login(self, arg):
         """Log in to the API. Usage: login <email> [password]"""
         args = arg.split();
@@ -95,11 +68,18 @@ class LeafmanCLI(cmd.Cmd):
         form_data = {'username': email, 'password': password}
         token_data = self._make_request('POST', '/auth/token', data=form_data, is_json=False)
         if token_data and 'access_token' in token_data:
-            self.token = token_data['access_token']
-            self.current_user = self._make_request('GET', '/users/me')
+            self.token = self.session.token = token_data['access_token']
+            self.session.refresh_token = token_data.get('refresh_token')
+            # Profile, balances and leave types are independent; fetch them together
+            self.current_user, balances, self.leave_types = fetch_concurrently(
+                lambda: self._make_request('GET', '/users/me'),
+                lambda: self._make_request('GET', '/users/me/balances'),
+                lambda: self._make_request('GET', '/leave-requests/types')
+            )
             if self.current_user:
                 print("\n[+] Login successful.")
                 self.prompt = f'({email}) '
+                if balances: pretty_print_table(balances, BALANCE_HEADERS)
             else:
                 print("\n[-] Failed to verify token or fetch profile.")
                 self.do_logout(None)
@@ -108,7 +88,7 @@ class LeafmanCLI(cmd.Cmd):
 
     def do_logout(self, arg):
         """Logs out of the current session."""
-        self.token = None; self.current_user = None; self.prompt = '(leafman) '
+        self.session.logout(); self.token = None; self.current_user = None; self.leave_types = None; self.prompt = '(leafman) '
         print("[*] Logged out.")
 
     def do_whoami(self, arg):
@@ -131,10 +111,7 @@ class LeafmanCLI(cmd.Cmd):
             return
 
         headers_map = {
-            "balance": {
-                "leave_type.name": "Leave Type", "year": "Year",
-                "balance_days": "Total Allowance", "used_days": "Days Used",
-            },
+            "balance": BALANCE_HEADERS,
             "requests": {
                 "request_id": "ID", "leave_type.name": "Type", "start_date": "Start Date",
                 "end_date": "End Date", "total_days": "Days", "status": "Status"
@@ -150,6 +127,10 @@ class LeafmanCLI(cmd.Cmd):
             print(f"[-] Unknown 'show' command: {arg}. See 'help show'.")
             return
 
+        if arg == "requests":
+            self._print_listing(endpoint_map[arg], headers_map[arg])
+            return
+
         response = self._make_request('GET', endpoint_map[arg])
 
         if response is not None:
@@ -163,7 +144,7 @@ class LeafmanCLI(cmd.Cmd):
     def do_apply(self, arg):
         """Interactively apply for a new leave request."""
         if not self.token: print("[-] Not logged in."); return
-        print("\n[*] Fetching available leave types..."); leave_types = self._make_request('GET', '/leave-requests/types')
+        print("\n[*] Fetching available leave types..."); leave_types = self._make_request('GET', '/leave-requests/types') or self.leave_types
         if not leave_types: print("[-] Could not fetch leave types."); return
         print("[*] Please choose a leave type:"); [print(f"  ID: {lt['leave_type_id']} -> {lt['name']}") for lt in leave_types]
         print("\n[*] Starting new leave application...")
@@ -195,6 +176,6 @@ if __name__ == '__main__':
     load_dotenv()
     api_url = os.getenv('LEAFMAN_API_URL', 'http://127.0.0.1:8000')
     try:
-        LeafmanCLI(api_url).cmdloop()
+        LeafmanCLI(ApiSession.from_env(api_url)).cmdloop()
     except KeyboardInterrupt:
         print("\n[*] Aborted by user. Exiting.")
\ No newline at end of file
@@ -0,0 +1,219 @@
+# leafman_batch.py
+"""
+Non-interactive batch mode for the admin console:
+
+    python leafman-admin.py run script.jsonl --email admin@example.com [--concurrency 8]
+    generate-ops | python leafman-admin.py run - --email admin@example.com
+
+Each script line is a JSON object with an "op" and that operation's fields:
+
+    {"op": "adduser", "email": ..., "password": ..., "first_name": ..., "last_name": ..., "join_date": ...}
+    {"op": "approve", "ids": "3-10,12", "note": "optional"}
+    {"op": "reject", "ids": [14, 15], "note": "required"}
+    {"op": "add_leavetype", "name": ..., "annual_quota": ..., "carry_forward": false}
+    {"op": "add_dept", "name": ...}
+    {"op": "add_holiday", "name": ..., "holiday_date": ..., "country_code": null}
+    {"op": "show", "what": "pending|all_requests|leavetypes|departments|holidays|balance"}
+    {"op": "wait"}
+
+Operations between two "wait" lines run concurrently and in no particular
+order; use "wait" when a later line depends on an earlier one. Within such a
+segment every adduser goes up in one users:import upload and all approve and
+reject decisions go through the batch endpoint. One JSON line is written per
+operation as it finishes, followed by a summary line. The password is read
+from LEAFMAN_PASSWORD or prompted for.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from getpass import getpass
+
+import requests
+
+from leafman_client import ApiSession
+
+# Largest batch accepted by PATCH /admin/leave-requests:batch
+BATCH_SIZE = 5000
+
+SHOW_ENDPOINTS = {
+    "pending": ("/admin/leave-requests", {"status": "Pending", "limit": 100}),
+    "all_requests": ("/admin/leave-requests", {"limit": 100}),
+    "leavetypes": ("/leave-requests/types", None),
+    "departments": ("/admin/departments/", None),
+    "holidays": ("/admin/holidays", None),
+    "balance": ("/users/me/balances", None),
+}
+
+CREATE_ENDPOINTS = {
+    "add_leavetype": "/admin/leave-types",
+    "add_dept": "/admin/departments",
+    "add_holiday": "/admin/holidays",
+}
+
+def parse_id_ranges(arg, limit=BATCH_SIZE):
+    """
+    Parses '3-10,12 15' into [3, 4, ..., 10, 12, 15]. Raises ValueError on bad
+    input, or if the ranges cover more than `limit` ids, before expanding them.
+    """
+    ids, total = [], 0
+    for part in arg.replace(',', ' ').split():
+        first, _, last = part.partition('-')
+        first = int(first); last = int(last) if last else first
+        if last < first: raise ValueError(part)
+        total += last - first + 1
+        if total > limit: raise ValueError(f"more than {limit} ids")
+        ids.extend(range(first, last + 1))
+    if not ids: raise ValueError(arg)
+    return list(dict.fromkeys(ids))
+
+def _error_detail(response):
+    try: return response.json().get('detail', response.text[:200])
+    except ValueError: return response.text[:200]
+
+class BatchRunner:
+    def __init__(self, session, concurrency, out=sys.stdout):
+        self.session = session
+        self.concurrency = concurrency
+        self.out = out
+        self.ok = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def emit(self, line, op, ok, started, **fields):
+        record = {"line": line, "op": op, "ok": ok, "ms": round(1000 * (time.perf_counter() - started), 1), **fields}
+        with self._lock:
+            if ok: self.ok += 1
+            else: self.failed += 1
+            self.out.write(json.dumps(record, default=str) + "\n"); self.out.flush()
+
+    def _single(self, line, op, fields):
+        started = time.perf_counter()
+        if op == "show":
+            endpoint, params = SHOW_ENDPOINTS[fields["what"]]
+            response = self.session.request('GET', endpoint, params=params)
+        else:
+            response = self.session.request('POST', CREATE_ENDPOINTS[op], json=fields)
+        if response.ok: self.emit(line, op, True, started, status=response.status_code, result=response.json())
+        else: self.emit(line, op, False, started, status=response.status_code, detail=_error_detail(response))
+
+    def _adduser(self, users):
+        """Creates users through one users:import upload, reporting per script line."""
+        started = time.perf_counter()
+        body = "".join(json.dumps(fields) + "\n" for _, fields in users).encode()
+        failed = {}
+        # No read timeout: password hashing for a large upload takes a while
+        with self.session.request('POST', '/admin/users:import', files={'file': ('batch.jsonl', body)},
+                                  params={'format': 'jsonl'}, stream=True, timeout=(self.session.timeout, None)) as response:
+            if not response.ok:
+                for line, fields in users:
+                    self.emit(line, "adduser", False, started, status=response.status_code,
+                              email=fields.get("email"), detail=_error_detail(response))
+                return
+            for raw in response.iter_lines():
+                record = json.loads(raw) if raw else {}
+                if record.get("type") == "error": failed[record["line"]] = record["detail"]
+        for upload_line, (line, fields) in enumerate(users, start=1):
+            if upload_line in failed: self.emit(line, "adduser", False, started, email=fields.get("email"), detail=failed[upload_line])
+            else: self.emit(line, "adduser", True, started, email=fields.get("email"))
+
+    def _decide(self, decisions):
+        """Sends (line, op, decision) tuples through the batch endpoint and reports per script line."""
+        started = time.perf_counter()
+        by_line = {}
+        for start in range(0, len(decisions), BATCH_SIZE):
+            chunk = decisions[start:start + BATCH_SIZE]
+            response = self.session.request('PATCH', '/admin/leave-requests:batch', json={"decisions": [d for _, _, d in chunk]})
+            if response.ok: results = response.json()["results"]
+            else: results = [{"request_id": d["request_id"], "ok": False, "detail": _error_detail(response)} for _, _, d in chunk]
+            # Results come back in the order the decisions were sent
+            for (line, op, _), result in zip(chunk, results):
+                entry = by_line.setdefault(line, {"op": op, "processed": 0, "failures": []})
+                if result["ok"]: entry["processed"] += 1
+                else: entry["failures"].append({"request_id": result["request_id"], "detail": result["detail"]})
+        for line, entry in by_line.items():
+            self.emit(line, entry["op"], not entry["failures"], started,
+                      processed=entry["processed"], failures=entry["failures"])
+
+    def run_segment(self, segment):
+        users, decisions, singles = [], [], []
+        for line, op, fields in segment:
+            if op == "adduser": users.append((line, fields))
+            elif op in ("approve", "reject"):
+                status = "Approved" if op == "approve" else "Rejected"
+                decisions.extend((line, op, {"request_id": request_id, "status": status, "approval_note": fields.get("note")})
+                                 for request_id in fields["ids"])
+            else: singles.append((line, op, fields))
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            # Each future maps to the script lines it reports on, for when it fails outright
+            futures = {pool.submit(self._single, line, op, fields): [(line, op)] for line, op, fields in singles}
+            if users: futures[pool.submit(self._adduser, users)] = [(line, "adduser") for line, _ in users]
+            if decisions: futures[pool.submit(self._decide, decisions)] = list(dict.fromkeys((line, op) for line, op, _ in decisions))
+            for future in as_completed(futures):
+                try: future.result()
+                except requests.exceptions.RequestException as e:
+                    for line, op in futures[future]:
+                        self.emit(line, op, False, started, detail=f"Connection Error: {e}")
+
+def parse_script(stream):
+    """Yields segments of (line, op, fields) split at "wait" lines; bad lines come back with op None."""
+    segment = []
+    for line_no, text in enumerate(stream, start=1):
+        if not text.strip() or text.lstrip().startswith("#"): continue
+        try:
+            fields = json.loads(text)
+            op = fields.pop("op")
+            if op == "wait":
+                if segment: yield segment
+                segment = []; continue
+            if op in ("approve", "reject"):
+                ids = fields.get("ids")
+                fields["ids"] = parse_id_ranges(ids) if isinstance(ids, str) else [int(i) for i in ids]
+                if op == "reject" and not fields.get("note"): raise ValueError("A reject needs a 'note'.")
+            elif op == "show":
+                if fields.get("what") not in SHOW_ENDPOINTS: raise ValueError(f"Unknown 'what': {fields.get('what')}")
+            elif op != "adduser" and op not in CREATE_ENDPOINTS:
+                raise ValueError(f"Unknown op: {op}")
+            segment.append((line_no, op, fields))
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            segment.append((line_no, None, {"detail": f"Invalid line: {e}"}))
+    if segment: yield segment
+
+def main(argv, api_url):
+    parser = argparse.ArgumentParser(prog="leafman-admin.py run", description="Run admin operations from a JSONL script.")
+    parser.add_argument("script", help="JSONL file of operations, or - for stdin")
+    parser.add_argument("--email", default=os.getenv("LEAFMAN_EMAIL"), required=not os.getenv("LEAFMAN_EMAIL"))
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args(argv)
+    session = ApiSession.from_env(api_url, pool_size=args.concurrency)
+
+    password = os.getenv("LEAFMAN_PASSWORD") or getpass("Password: ")
+    try:
+        response = session.request('POST', '/auth/token', data={'username': args.email, 'password': password})
+    except requests.exceptions.RequestException as e:
+        print(json.dumps({"summary": True, "ok": False, "detail": f"Connection Error: {e}"})); return 1
+    if not response.ok:
+        print(json.dumps({"summary": True, "ok": False, "detail": _error_detail(response)})); return 1
+    tokens = response.json()
+    session.token, session.refresh_token = tokens['access_token'], tokens.get('refresh_token')
+
+    runner = BatchRunner(session, args.concurrency)
+    started = time.perf_counter()
+    stream = sys.stdin if args.script == "-" else open(args.script)
+    with stream:
+        for segment in parse_script(stream):
+            for line, op, fields in segment:
+                if op is None: runner.emit(line, None, False, time.perf_counter(), **fields)
+            runner.run_segment([entry for entry in segment if entry[1] is not None])
+    session.logout()
+    elapsed = time.perf_counter() - started
+    total = runner.ok + runner.failed
+    print(json.dumps({
+        "summary": True, "ops": total, "ok": runner.ok, "failed": runner.failed,
+        "seconds": round(elapsed, 3), "ops_per_second": round(total / elapsed, 1) if elapsed else None,
+    }))
+    return 1 if runner.failed else 0
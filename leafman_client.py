@@ -0,0 +1,167 @@
+# leafman_client.py
+"""
+HTTP plumbing shared by the Leafman CLIs: one pooled keep-alive session with
+retries and timeouts, concurrent fetches, and an optional on-disk ETag cache
+for rarely-changing reference lists.
+"""
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Endpoints whose responses carry an ETag and are worth keeping on disk
+CACHEABLE_ENDPOINTS = {"/leave-requests/types", "/admin/departments/"}
+
+class ResponseCache:
+    """Stores JSON bodies with their ETag, one file per URL."""
+
+    def __init__(self, directory):
+        self.directory = os.path.expanduser(directory)
+
+    def _path(self, url):
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def get(self, url):
+        try:
+            with open(self._path(url)) as f:
+                entry = json.load(f)
+            return entry["etag"], entry["body"].encode()
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, url, etag, body):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write then rename so a concurrent reader never sees half a file
+            tmp = self._path(url) + f".{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"etag": etag, "body": body.decode()}, f)
+            os.replace(tmp, self._path(url))
+        except OSError:
+            pass
+
+class ApiSession:
+    """
+    A requests.Session bound to the API base URL. Connections are kept alive
+    and reused, idempotent requests are retried on connection errors and
+    502/503/504 with backoff, and every call gets a timeout unless the caller
+    passes its own. GETs of CACHEABLE_ENDPOINTS are revalidated against the
+    on-disk cache when one is configured. When the access token expires, the
+    refresh token from login renews it and the request is sent again.
+    """
+
+    def __init__(self, base_url, timeout=10.0, retries=3, cache_dir=None, pool_size=8):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.token = None
+        self.refresh_token = None
+        self._renew_lock = threading.Lock()
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        self.http = requests.Session()
+        retry = Retry(
+            total=retries, backoff_factor=0.3, status_forcelist=(502, 503, 504),
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS, raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.http.mount("http://", adapter)
+        self.http.mount("https://", adapter)
+
+    @classmethod
+    def from_env(cls, base_url, **kwargs):
+        """Builds a session configured by LEAFMAN_TIMEOUT, LEAFMAN_RETRIES and LEAFMAN_CACHE_DIR."""
+        return cls(
+            base_url,
+            timeout=float(os.getenv("LEAFMAN_TIMEOUT", "10")),
+            retries=int(os.getenv("LEAFMAN_RETRIES", "3")),
+            cache_dir=os.getenv("LEAFMAN_CACHE_DIR") or None,
+            **kwargs
+        )
+
+    def request(self, method, endpoint, headers=None, **kwargs):
+        token = self.token
+        response = self._send(method, endpoint, headers, token, **kwargs)
+        # Uploads are not replayed: their file objects have been read already
+        if response.status_code == 401 and token and "files" not in kwargs and self._renew(token):
+            response = self._send(method, endpoint, headers, self.token, **kwargs)
+        return response
+
+    def _renew(self, stale_token):
+        """Swaps the refresh token for a new access token; True if the request is worth retrying."""
+        with self._renew_lock:
+            if self.token != stale_token:
+                # Another thread renewed while this request was in flight
+                return True
+            if not self.refresh_token:
+                return False
+            response = self.http.post(
+                f"{self.base_url}/auth/refresh", json={"refresh_token": self.refresh_token}, timeout=self.timeout
+            )
+            if not response.ok:
+                self.refresh_token = None
+                return False
+            tokens = response.json()
+            self.token, self.refresh_token = tokens["access_token"], tokens.get("refresh_token")
+            return True
+
+    def logout(self):
+        """Revokes the refresh token on the server, best effort, and forgets both tokens."""
+        if self.refresh_token:
+            try:
+                self.http.post(f"{self.base_url}/auth/logout", json={"refresh_token": self.refresh_token}, timeout=self.timeout)
+            except requests.exceptions.RequestException:
+                pass
+        self.token = self.refresh_token = None
+
+    def _send(self, method, endpoint, headers, token, **kwargs):
+        headers = dict(headers or {})
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        kwargs.setdefault("timeout", self.timeout)
+        url = f"{self.base_url}{endpoint}"
+        method = method.upper()
+
+        cached = None
+        if self.cache and method == "GET" and endpoint in CACHEABLE_ENDPOINTS:
+            cached = self.cache.get(url)
+            if cached:
+                headers["If-None-Match"] = cached[0]
+        response = self.http.request(method, url, headers=headers, **kwargs)
+        if cached and response.status_code == 304:
+            # Hand callers the stored body as if the server had sent it
+            response.status_code = 200
+            response._content = cached[1]
+        elif self.cache and method == "GET" and endpoint in CACHEABLE_ENDPOINTS and response.ok and response.headers.get("ETag"):
+            self.cache.set(url, response.headers["ETag"], response.content)
+        return response
+
+    def close(self):
+        self.http.close()
+
+def iter_pages(session, endpoint, params=None, limit=100):
+    """
+    Yields the rows of a cursor-paginated listing page by page, following
+    X-Next-Cursor until the last page. Raises requests' HTTPError on a failed
+    page. The next page is only requested once the caller has consumed the
+    current one.
+    """
+    params = {**(params or {}), "limit": limit}
+    while True:
+        response = session.request("GET", endpoint, params=params)
+        response.raise_for_status()
+        yield from response.json()
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return
+        params["cursor"] = cursor
+
+def fetch_concurrently(*calls):
+    """Runs independent zero-argument calls on threads and returns their results in order."""
+    if len(calls) == 1:
+        return [calls[0]()]
+    with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+        return [future.result() for future in [pool.submit(call) for call in calls]]
@@ -0,0 +1,76 @@
+# leafman_render.py
+"""
+Table rendering shared by the Leafman CLIs. Rows are printed as they arrive:
+column widths are fixed from the headers and a sample of the first rows,
+longer cells are truncated, and a pager pauses between screens when running
+in a terminal.
+"""
+import itertools
+import shutil
+import sys
+from operator import itemgetter
+
+# Rows used to size the columns before anything is printed
+SAMPLE_SIZE = 50
+MAX_COLUMN_WIDTH = 40
+
+def compile_accessor(key):
+    """
+    Returns a function reading `key` from a row, following dots into nested
+    dicts ('leave_type.name'). Missing values and None render as "".
+    """
+    getters = [itemgetter(part) for part in key.split('.')]
+
+    def access(row):
+        value = row
+        try:
+            for getter in getters:
+                value = getter(value)
+        except (KeyError, TypeError, IndexError):
+            return ""
+        return "" if value is None else value
+    return access
+
+def _fit(value, width):
+    text = str(value)
+    if len(text) > width:
+        return text[:width - 1] + "…"
+    return text.ljust(width)
+
+def _pager_pause():
+    """Waits for the user between screens; returns False if they asked to stop."""
+    try:
+        answer = input("-- more: Enter to continue, q to stop -- ")
+    except EOFError:
+        return False
+    return answer.strip().lower() != "q"
+
+def pretty_print_table(rows, headers, paged=False, max_width=MAX_COLUMN_WIDTH, sample_size=SAMPLE_SIZE):
+    """
+    Prints an iterable of dicts as a table with the given {key: header}
+    columns. Only the first `sample_size` rows are held in memory to size the
+    columns; the rest stream straight through. With `paged`, stops after
+    each screenful while stdin and stdout are a terminal.
+    """
+    rows = iter(rows)
+    sample = list(itertools.islice(rows, sample_size))
+    if not sample: print("[*] No data to display."); return
+
+    keys = list(headers)
+    accessors = [compile_accessor(key) for key in keys]
+    widths = [len(str(headers[key])) for key in keys]
+    for row in sample:
+        for i, access in enumerate(accessors):
+            widths[i] = max(widths[i], len(str(access(row))))
+    widths = [min(width, max(max_width, len(str(headers[key])))) for width, key in zip(widths, keys)]
+
+    header_line = " | ".join(_fit(headers[key], width) for key, width in zip(keys, widths))
+    print("\n" + header_line); print("-" * len(header_line))
+
+    screen = max(shutil.get_terminal_size().lines - 3, 5)
+    interactive = paged and sys.stdin.isatty() and sys.stdout.isatty()
+    for count, row in enumerate(itertools.chain(sample, rows), start=1):
+        print(" | ".join(_fit(access(row), width) for access, width in zip(accessors, widths)))
+        if interactive and count % screen == 0 and not _pager_pause():
+            break
+    print()
@@ -0,0 +1,39 @@
+# tests/conftest.py
+"""
+Shared fixtures. Every database test runs on a scratch SQLite file, and
+again on PostgreSQL when TEST_POSTGRES_URL is set. SQLite serializes
+writers, so races such as concurrent approvals are only really exercised
+on PostgreSQL. The PostgreSQL tables are dropped and recreated, so use a
+throwaway database.
+"""
+import os
+
+# The app builds its own engine at import time; keep it off any real database
+os.environ["DATABASE_URL"] = "sqlite://"
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models.all_models import Base
+
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+DATABASES = [
+    pytest.param("sqlite", id="sqlite"),
+    pytest.param("postgresql", id="postgresql", marks=pytest.mark.skipif(
+        POSTGRES_URL is None, reason="TEST_POSTGRES_URL is not set"
+    )),
+]
+
+@pytest.fixture(params=DATABASES)
+def engine(request, tmp_path):
+    url = f"sqlite:///{tmp_path / 'test.db'}" if request.param == "sqlite" else POSTGRES_URL
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False)
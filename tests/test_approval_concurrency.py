@@ -0,0 +1,101 @@
+# tests/test_approval_concurrency.py
+"""
+Approvals under concurrency. Each user's pending requests add up to more
+than their balance, and every request is approved from several threads at
+once through leave_service.process_leave_request. No balance may be
+overdrawn, used_days must equal the approved days, and each request must be
+decided exactly once. Runs on PostgreSQL (READ COMMITTED) when
+TEST_POSTGRES_URL is set; SQLite serializes the writers.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from fastapi import HTTPException
+from app.models import all_models as m
+from app.schemas import leave_schemas as ls
+from app.services import leave_service
+
+USERS = 8
+REQUESTS_PER_USER = 12
+BALANCE_DAYS = 5
+ATTEMPTS = 3
+THREADS = 16
+
+def _seed(db):
+    year = date.today().year
+    leave_type = m.LeaveType(name="Annual", annual_quota=BALANCE_DAYS)
+    approver = m.User(first_name="Stress", last_name="Admin", email="admin@example.com",
+                      password_hash="-", join_date=date(year, 1, 1), role="Admin")
+    db.add_all([leave_type, approver])
+    db.flush()
+    employees = [
+        m.User(first_name="Stress", last_name=str(i), email=f"user-{i}@example.com",
+               password_hash="-", join_date=date(year, 1, 1))
+        for i in range(USERS)
+    ]
+    db.add_all(employees)
+    db.flush()
+    db.add_all(
+        m.LeaveBalance(user_id=u.user_id, leave_type_id=leave_type.leave_type_id, year=year,
+                       balance_days=BALANCE_DAYS, used_days=0)
+        for u in employees
+    )
+    requests = [
+        m.LeaveRequest(user_id=u.user_id, leave_type_id=leave_type.leave_type_id,
+                       start_date=date(year, 1, 1) + timedelta(days=d), end_date=date(year, 1, 1) + timedelta(days=d),
+                       total_days=1, status="Pending")
+        for u in employees for d in range(REQUESTS_PER_USER)
+    ]
+    db.add_all(requests)
+    db.commit()
+    return approver.user_id, [r.request_id for r in requests]
+
+def _check_balances(session_factory, approved_ids):
+    # No request was approved twice, and every user got some leave approved
+    assert len(approved_ids) == len(set(approved_ids))
+    with session_factory() as db:
+        balances = db.query(m.LeaveBalance).all()
+        assert len(balances) == USERS
+        for balance in balances:
+            approved = db.query(m.LeaveRequest).filter_by(user_id=balance.user_id, status="Approved").all()
+            assert balance.used_days <= balance.balance_days
+            assert balance.used_days == sum(r.total_days for r in approved)
+            assert approved
+        # Every successful approval shows up as exactly one approved request
+        assert db.query(m.LeaveRequest).filter_by(status="Approved").count() == len(approved_ids)
+
+def test_concurrent_approvals_never_overdraw_or_lose_updates(session_factory):
+    with session_factory() as db:
+        approver_id, request_ids = _seed(db)
+    decision = ls.LeaveApproval(status="Approved")
+
+    def approve(request_id):
+        with session_factory() as db:
+            approver = db.get(m.User, approver_id)
+            try:
+                leave_service.process_leave_request(db, request_id, decision, approver)
+                return request_id
+            except HTTPException:
+                return None
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        outcomes = list(pool.map(approve, [r for r in request_ids for _ in range(ATTEMPTS)]))
+    _check_balances(session_factory, [request_id for request_id in outcomes if request_id is not None])
+
+def test_concurrent_batches_never_overdraw_or_lose_updates(session_factory):
+    with session_factory() as db:
+        approver_id, request_ids = _seed(db)
+    # Every batch is sent ATTEMPTS times at once
+    size = len(request_ids) // 4
+    batches = [request_ids[start:start + size] for start in range(0, len(request_ids), size)] * ATTEMPTS
+
+    def approve(batch):
+        with session_factory() as db:
+            approver = db.get(m.User, approver_id)
+            response = leave_service.process_leave_requests_batch(
+                db, [ls.LeaveDecision(request_id=r, status="Approved") for r in batch], approver
+            )
+            return [result.request_id for result in response.results if result.ok]
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        outcomes = list(pool.map(approve, batches))
+    _check_balances(session_factory, [request_id for batch in outcomes for request_id in batch])
@@ -0,0 +1,37 @@
+# tests/test_calendar_service.py
+from datetime import date
+import pytest
+from app.config import settings
+from app.models import all_models as m
+from app.services import calendar_service
+
+@pytest.fixture
+def holidays(session_factory, monkeypatch):
+    # Mon 2025-03-03 .. Fri 2025-03-07: a shared holiday, and one each for IN and US
+    monkeypatch.setattr(settings, "HOLIDAY_COUNTRY_CODE", None)
+    calendar_service.invalidate_calendars()
+    with session_factory() as db:
+        db.add_all([
+            m.Holiday(name="Everywhere", holiday_date=date(2025, 3, 3)),
+            m.Holiday(name="India only", holiday_date=date(2025, 3, 4), country_code="IN"),
+            m.Holiday(name="US only", holiday_date=date(2025, 3, 5), country_code="US"),
+            m.Holiday(name="US too", holiday_date=date(2025, 3, 4), country_code="US"),
+        ])
+        db.commit()
+    yield
+    calendar_service.invalidate_calendars()
+
+@pytest.mark.parametrize("country_code, expected", [
+    ("IN", 3),   # shared and IN holidays
+    ("US", 2),   # shared and both US holidays
+    ("GB", 4),   # shared holiday only
+    (None, 4),   # no country: other countries' holidays must not count
+])
+def test_working_days_count_only_the_users_country(session_factory, holidays, country_code, expected):
+    with session_factory() as db:
+        assert calendar_service.count_working_days(db, date(2025, 3, 3), date(2025, 3, 7), country_code) == expected
+
+def test_default_country_applies_when_user_has_none(session_factory, holidays, monkeypatch):
+    monkeypatch.setattr(settings, "HOLIDAY_COUNTRY_CODE", "IN")
+    with session_factory() as db:
+        assert calendar_service.count_working_days(db, date(2025, 3, 3), date(2025, 3, 7)) == 3
@@ -0,0 +1,29 @@
+# tests/test_http_cache.py
+import asyncio
+from pydantic import TypeAdapter
+from starlette.requests import Request
+from app import http_cache
+
+ADAPTER = TypeAdapter(list[str])
+
+def _get(load):
+    request = Request({"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b""})
+    return asyncio.run(http_cache.cached_json_response(request, "test-key", load, ADAPTER, "no-cache"))
+
+def test_load_racing_an_invalidation_is_not_cached():
+    http_cache.reference_cache.clear()
+
+    async def stale_load():
+        # The list changes and is invalidated while this load is in flight
+        http_cache.reference_cache.invalidate("test-key")
+        return ["old"]
+
+    assert _get(stale_load).body == b'["old"]'
+    assert http_cache.reference_cache.get("test-key") is None
+
+    async def fresh_load():
+        return ["new"]
+
+    first = _get(fresh_load)
+    assert first.body == b'["new"]'
+    assert http_cache.reference_cache.get("test-key")[1] == first.headers["etag"]
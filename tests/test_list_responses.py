@@ -0,0 +1,60 @@
+# tests/test_list_responses.py
+"""
+The leave request listings build their response dicts from raw rows and
+send them with json_response, bypassing FastAPI's response_model. These
+tests hold the dicts to the route's declared model: every field valid,
+no extra keys, and the same JSON the model would have produced.
+"""
+from datetime import date
+import pytest
+from pydantic import TypeAdapter
+from app import json_response
+from app.routers import admin_router, leave_router
+from app.models import all_models as m
+from app.services import leave_service
+
+def _declared_model(router, path: str) -> TypeAdapter:
+    route = next(r for r in router.routes if r.path == path and "GET" in r.methods)
+    return TypeAdapter(route.response_model)
+
+def _field_names(model) -> set[str]:
+    return set(model.model_fields)
+
+def _assert_matches(adapter: TypeAdapter, rows: list[dict]):
+    validated = adapter.validate_python(rows)
+    assert json_response.dumps(rows) == adapter.dump_json(validated)
+    for row, item in zip(rows, validated):
+        assert set(row) == _field_names(type(item))
+        assert set(row["leave_type"]) == _field_names(type(item.leave_type))
+
+@pytest.fixture
+def user_id(session_factory):
+    with session_factory() as db:
+        leave_type = m.LeaveType(name="Annual", annual_quota=20)
+        user = m.User(first_name="List", last_name="Check", email="list@example.com",
+                      password_hash="-", join_date=date(2025, 1, 1))
+        db.add_all([leave_type, user])
+        db.flush()
+        db.add_all(
+            m.LeaveRequest(user_id=user.user_id, leave_type_id=leave_type.leave_type_id,
+                           start_date=date(2025, 3, day), end_date=date(2025, 3, day),
+                           total_days="0.5" if day % 2 else 1, is_half_day=bool(day % 2),
+                           status="Pending", reason=None if day % 2 else "Trip")
+            for day in range(3, 8)
+        )
+        db.commit()
+        return user.user_id
+
+def test_user_listing_matches_declared_model(session_factory, user_id):
+    with session_factory() as db:
+        rows, _ = leave_service.get_user_leave_requests(db, user_id, page=1, limit=10)
+    assert len(rows) == 5
+    _assert_matches(_declared_model(leave_router.router, "/leave-requests/"), rows)
+
+def test_admin_listing_matches_declared_model(session_factory, user_id):
+    with session_factory() as db:
+        rows, _ = leave_service.list_leave_requests(db, "Pending", page=1, limit=10)
+    assert len(rows) == 5
+    _assert_matches(_declared_model(admin_router.router, "/admin/leave-requests"), rows)
+    for row in rows:
+        assert set(row["user"]) == {"user_id", "first_name", "last_name"}
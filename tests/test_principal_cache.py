@@ -0,0 +1,43 @@
+# tests/test_principal_cache.py
+from datetime import date
+import pytest
+from app.models import all_models as m
+from app.services import auth_service
+
+@pytest.fixture
+def user_id(session_factory):
+    auth_service.principal_cache.clear()
+    with session_factory() as db:
+        user = m.User(first_name="Cache", last_name="Check", email="cache@example.com",
+                      password_hash="-", join_date=date(2025, 1, 1), role="Admin")
+        db.add(user)
+        db.commit()
+        yield user.user_id
+    auth_service.principal_cache.clear()
+
+def test_change_is_dropped_from_cache_on_commit_not_flush(session_factory, user_id):
+    with session_factory() as db:
+        auth_service.cache_principal(db.get(m.User, user_id))
+        db.get(m.User, user_id).role = "Employee"
+        db.flush()
+        assert auth_service.get_cached_principal("cache@example.com").role == "Admin"
+        db.commit()
+    assert auth_service.get_cached_principal("cache@example.com") is None
+
+def test_rolled_back_change_keeps_cache(session_factory, user_id):
+    with session_factory() as db:
+        auth_service.cache_principal(db.get(m.User, user_id))
+        db.get(m.User, user_id).role = "Employee"
+        db.flush()
+        db.rollback()
+        db.commit()
+    assert auth_service.get_cached_principal("cache@example.com").role == "Admin"
+
+def test_load_racing_a_change_is_not_cached(session_factory, user_id):
+    with session_factory() as reader, session_factory() as writer:
+        generation = auth_service.principal_generation()
+        stale = reader.get(m.User, user_id)
+        writer.get(m.User, user_id).role = "Employee"
+        writer.commit()
+        auth_service.cache_principal(stale, generation)
+    assert auth_service.get_cached_principal("cache@example.com") is None
@@ -0,0 +1,83 @@
+# tests/test_query_plans.py
+"""
+The overlap/pending and balance lookups in apply_for_leave must stay index
+scans. The statements apply_for_leave actually sends are recorded and each
+is explained on the same connection: EXPLAIN QUERY PLAN on SQLite, EXPLAIN
+on PostgreSQL.
+"""
+from datetime import date
+import pytest
+from sqlalchemy import event, text
+from app.models import all_models as m
+from app.schemas import leave_schemas as ls
+from app.services import calendar_service, leave_service
+
+def _seed(db):
+    department = m.Department(name="Engineering")
+    leave_type = m.LeaveType(name="Annual", annual_quota=20)
+    db.add_all([department, leave_type])
+    db.flush()
+    user = m.User(first_name="Plan", last_name="Check", email="plan@example.com", password_hash="-",
+                  department_id=department.department_id, join_date=date(2025, 1, 1))
+    db.add(user)
+    db.flush()
+    db.add(m.LeaveBalance(user_id=user.user_id, leave_type_id=leave_type.leave_type_id, year=2025,
+                          balance_days=20, used_days=0))
+    db.add(m.LeaveRequest(user_id=user.user_id, leave_type_id=leave_type.leave_type_id,
+                          start_date=date(2025, 2, 3), end_date=date(2025, 2, 4), total_days=2, status="Pending"))
+    db.commit()
+    return user.user_id, leave_type.leave_type_id
+
+def _record_selects(engine, table):
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        head = statement.lstrip().upper()
+        if head.startswith("SELECT") and f"FROM {table.upper()}" in head:
+            statements.append((statement, parameters))
+    return statements
+
+def _plan(db, statement, parameters) -> str:
+    if db.get_bind().dialect.name == "sqlite":
+        rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        return "\n".join(row[-1] for row in rows)
+    # Tiny tables would otherwise be read sequentially whatever indexes exist
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    rows = db.connection().exec_driver_sql(f"EXPLAIN {statement}", parameters).all()
+    return "\n".join(row[0] for row in rows)
+
+def _unique_balance_index(db) -> str:
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLite backs a unique constraint with an unnamed autoindex
+        indexes = db.execute(text("PRAGMA index_list('leave_balances')")).mappings()
+        return next(index["name"] for index in indexes if index["origin"] == "u")
+    return "uq_leave_balances_user_type_year"
+
+@pytest.fixture
+def filed_request(engine, session_factory):
+    calendar_service.invalidate_calendars()
+    with session_factory() as db:
+        user_id, leave_type_id = _seed(db)
+    statements = {table: _record_selects(engine, table) for table in ("leave_requests", "leave_balances")}
+    with session_factory() as db:
+        user = db.get(m.User, user_id)
+        leave_service.apply_for_leave(db, user, ls.LeaveRequestCreate(
+            leave_type_id=leave_type_id, start_date=date(2025, 3, 3), end_date=date(2025, 3, 5)
+        ))
+    return statements
+
+def test_overlap_and_pending_lookup_uses_user_status_dates_index(session_factory, filed_request):
+    assert filed_request["leave_requests"], "apply_for_leave no longer reads leave_requests"
+    with session_factory() as db:
+        for statement, parameters in filed_request["leave_requests"]:
+            plan = _plan(db, statement, parameters)
+            assert "ix_leave_requests_user_status_dates" in plan, plan
+
+def test_balance_lookup_uses_unique_balance_index(session_factory, filed_request):
+    assert filed_request["leave_balances"], "apply_for_leave no longer reads leave_balances"
+    with session_factory() as db:
+        index = _unique_balance_index(db)
+        for statement, parameters in filed_request["leave_balances"]:
+            plan = _plan(db, statement, parameters)
+            assert index in plan, plan
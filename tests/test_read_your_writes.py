@@ -0,0 +1,40 @@
+# tests/test_read_your_writes.py
+import asyncio
+from starlette.requests import Request
+from app import database
+from app.middleware import ReadYourWritesMiddleware
+
+def _scope(method, headers=()):
+    return {"type": "http", "method": method, "path": "/", "headers": list(headers), "query_string": b""}
+
+def _respond(method, status):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    sent = []
+    async def send(message):
+        sent.append(message)
+    asyncio.run(ReadYourWritesMiddleware(app)(_scope(method), None, send))
+    return dict(sent[0]["headers"])
+
+def test_successful_write_pins_client_to_primary(monkeypatch):
+    monkeypatch.setattr(database, "replicas", database.ReplicaSet([("replica-0", None)]))
+    headers = _respond("POST", 201)
+    cookie = headers[b"set-cookie"].decode().split(";")[0]
+    assert cookie.startswith(database.PRIMARY_PIN_COOKIE + "=")
+    # Any worker reading the cookie or the header back sends the client to the primary
+    assert database._read_from_primary(Request(_scope("GET", [(b"cookie", cookie.encode())])))
+    pin = (b"x-primary-until", headers[b"x-primary-until"])
+    assert database._read_from_primary(Request(_scope("GET", [pin])))
+    assert not database._read_from_primary(Request(_scope("GET")))
+
+def test_failed_writes_and_reads_do_not_pin(monkeypatch):
+    monkeypatch.setattr(database, "replicas", database.ReplicaSet([("replica-0", None)]))
+    assert b"set-cookie" not in _respond("POST", 400)
+    assert b"set-cookie" not in _respond("GET", 200)
+
+def test_expired_or_malformed_pin_reads_from_replica(monkeypatch):
+    monkeypatch.setattr(database, "replicas", database.ReplicaSet([("replica-0", None)]))
+    for value in (b"1000", b"soon"):
+        assert not database._read_from_primary(Request(_scope("GET", [(b"x-primary-until", value)])))
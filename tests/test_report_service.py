@@ -0,0 +1,41 @@
+# tests/test_report_service.py
+from datetime import date
+import pytest
+from app.models import all_models as m
+from app.services import report_service
+
+@pytest.fixture(params=["upsert", "portable"])
+def department_id(request, session_factory, monkeypatch):
+    if request.param == "portable":
+        # As on a database without INSERT ... ON CONFLICT
+        monkeypatch.setattr(report_service, "_upsert_insert", lambda db: None)
+    with session_factory() as db:
+        department = m.Department(name="Engineering")
+        db.add(department)
+        db.commit()
+        return department.department_id
+
+def _summary(db):
+    return {
+        (row.day, row.absent_count, row.pending_count)
+        for row in db.query(m.DepartmentAbsenceDay).order_by(m.DepartmentAbsenceDay.day)
+    }
+
+def test_adjust_department_absence_adds_to_existing_days(session_factory, department_id):
+    with session_factory() as db:
+        # Filed for 3-4 March, then a second request for 4-5 March, then the first approved
+        report_service.adjust_department_absence(db, [(department_id, date(2025, 3, 3), date(2025, 3, 4), 0, 1)])
+        report_service.adjust_department_absence(db, [(department_id, date(2025, 3, 4), date(2025, 3, 5), 0, 1)])
+        report_service.adjust_department_absence(db, [(department_id, date(2025, 3, 3), date(2025, 3, 4), 1, -1)])
+        db.commit()
+        assert _summary(db) == {
+            (date(2025, 3, 3), 1, 0),
+            (date(2025, 3, 4), 1, 1),
+            (date(2025, 3, 5), 0, 1),
+        }
+
+def test_users_without_department_are_skipped(session_factory, department_id):
+    with session_factory() as db:
+        report_service.adjust_department_absence(db, [(None, date(2025, 3, 3), date(2025, 3, 4), 0, 1)])
+        db.commit()
+        assert _summary(db) == set()
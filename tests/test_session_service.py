@@ -0,0 +1,56 @@
+# tests/test_session_service.py
+from datetime import date
+import pytest
+from app.models import all_models as m
+from app.services import session_service
+
+@pytest.fixture(params=["database", "memory"])
+def store(request, monkeypatch):
+    store = session_service.DatabaseSessionStore() if request.param == "database" else session_service.MemorySessionStore()
+    monkeypatch.setattr(session_service, "session_store", store)
+    return store
+
+@pytest.fixture
+def user_id(session_factory):
+    with session_factory() as db:
+        user = m.User(first_name="Session", last_name="Check", email="session@example.com",
+                      password_hash="-", join_date=date(2025, 1, 1), role="Admin")
+        db.add(user)
+        db.commit()
+        return user.user_id
+
+def test_rotation_issues_a_working_token_once(session_factory, store, user_id):
+    with session_factory() as db:
+        token = session_service.issue_refresh_token(db, user_id)
+        user, renewed = session_service.rotate_refresh_token(db, token)
+        assert user.user_id == user_id
+        assert session_service.rotate_refresh_token(db, renewed) is not None
+
+def test_replayed_token_revokes_the_session(session_factory, store, user_id):
+    with session_factory() as db:
+        stolen = session_service.issue_refresh_token(db, user_id)
+        _, renewed = session_service.rotate_refresh_token(db, stolen)
+        assert session_service.rotate_refresh_token(db, stolen) is None
+        # The legitimate holder's newer token no longer works either
+        assert session_service.rotate_refresh_token(db, renewed) is None
+
+@pytest.mark.parametrize("change", [
+    lambda db, user: setattr(user, "role", "Employee"),
+    lambda db, user: setattr(user, "password_hash", "new"),
+    lambda db, user: db.delete(user),
+])
+def test_user_change_revokes_sessions(session_factory, store, user_id, change):
+    with session_factory() as db:
+        token = session_service.issue_refresh_token(db, user_id)
+        change(db, db.get(m.User, user_id))
+        db.commit()
+        assert session_service.rotate_refresh_token(db, token) is None
+        # Gone, not just unusable because the user is
+        assert store.revoke_user(db, user_id) == 0
+
+def test_unrelated_user_change_keeps_sessions(session_factory, store, user_id):
+    with session_factory() as db:
+        token = session_service.issue_refresh_token(db, user_id)
+        db.get(m.User, user_id).first_name = "Renamed"
+        db.commit()
+        assert session_service.rotate_refresh_token(db, token) is not None